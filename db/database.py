@@ -1,22 +1,76 @@
 """
 Database configuration and session management.
-Uses async SQLAlchemy with SQLite.
+Uses async SQLAlchemy with SQLite (override with the DATABASE_URL env var).
 """
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import event
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-DATABASE_URL = "sqlite+aiosqlite:///./app.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./app.db")
 
-# Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    connect_args={"check_same_thread": False}
+# Connection pool sizing for file/network databases. SQLite serializes writers,
+# so a small pool is enough; raise these when DATABASE_URL points at a server.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Per-connection SQLite tuning: WAL lets readers proceed while the background
+# analysis writes, and synchronous=NORMAL avoids an fsync on every commit.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-64000;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA foreign_keys=ON;",
 )
 
+
+def _sqlite_pragmas(dbapi_conn, _connection_record):
+    """Apply SQLITE_PRAGMAS to every new DBAPI connection."""
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def create_engine_for_url(url: str) -> AsyncEngine:
+    """Create the async engine, applying SQLite-only settings when relevant."""
+    parsed_url = make_url(url)
+    is_sqlite = parsed_url.get_backend_name() == "sqlite"
+
+    engine_kwargs = {}
+    if is_sqlite:
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+
+    # aiosqlite defaults to NullPool for file databases, which reopens the file
+    # (and its WAL/SHM handles) on every session. Keep a small persistent pool
+    # instead; in-memory databases keep the dialect default (StaticPool).
+    if parsed_url.database not in (None, "", ":memory:"):
+        engine_kwargs.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        if not is_sqlite:
+            # Server connections can be dropped by the peer while idle
+            engine_kwargs.update(pool_pre_ping=True, pool_recycle=1800)
+
+    new_engine = create_async_engine(url, echo=False, **engine_kwargs)
+
+    if is_sqlite:
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas)
+
+    return new_engine
+
+
+# Create async engine
+engine = create_engine_for_url(DATABASE_URL)
+
 # Create async session factory
 async_session_maker = async_sessionmaker(
     engine,
@@ -36,10 +90,13 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def close_db():
+    """Close pooled connections (aiosqlite workers are non-daemon threads)."""
+    await engine.dispose()
+
+
 async def init_db():
-    """Initialize database and enable foreign keys."""
+    """Initialize database (connection PRAGMAs are applied by _sqlite_pragmas)."""
     async with engine.begin() as conn:
-        # Enable foreign keys for SQLite
-        await conn.exec_driver_sql("PRAGMA foreign_keys = ON;")
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
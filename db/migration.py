@@ -12,9 +12,6 @@ async def migrate_to_v2():
     Old tables remain for backward compatibility but are deprecated.
     """
     async with engine.begin() as conn:
-        # Enable foreign keys
-        await conn.exec_driver_sql("PRAGMA foreign_keys = ON;")
-        
         # Check if new table exists
         result = await conn.execute(text(
             "SELECT name FROM sqlite_master WHERE type='table' AND name='analysis_results';"
@@ -104,4 +101,40 @@ async def add_diagram_column():
             ))
             print("✓ Added architecture_diagram_mermaid column to analysis_summary")
         else:
-            print("✓ architecture_diagram_mermaid column already exists")
\ No newline at end of file
+            print("✓ architecture_diagram_mermaid column already exists")
+
+
+async def add_prompt_hash_column():
+    """
+    Idempotent migration: adds `prompt_hash` TEXT column to the
+    `raw_analysis_responses` table if it does not already exist.
+
+    Safe to run on every startup — does nothing when the column already exists.
+    """
+    async with engine.begin() as conn:
+        result = await conn.execute(text("PRAGMA table_info(raw_analysis_responses);"))
+        columns = [row[1] for row in result.fetchall()]   # row[1] = column name
+
+        if "prompt_hash" not in columns:
+            await conn.execute(text(
+                "ALTER TABLE raw_analysis_responses ADD COLUMN prompt_hash TEXT;"
+            ))
+            print("✓ Added prompt_hash column to raw_analysis_responses")
+
+
+async def add_performance_indexes():
+    """
+    Idempotent migration: creates composite indexes declared in models.schemas.
+
+    create_all() only builds indexes for tables it creates, so databases that
+    predate these indexes need them added explicitly. Safe to run on every startup.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_sessions_repo_started "
+            "ON analysis_sessions(repo_id, started_at);"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_qa_repo_question "
+            "ON qa_logs(repo_id, question);"
+        ))
@@ -0,0 +1,26 @@
+"""
+Custom SQLAlchemy column types.
+"""
+import orjson
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+class CompactJSON(TypeDecorator):
+    """
+    JSON value stored as compact orjson-encoded bytes in a BLOB column.
+
+    Rows written before a column switched to this type hold JSON TEXT;
+    orjson.loads accepts both str and bytes, so those still read correctly.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return orjson.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return orjson.loads(value)
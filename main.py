@@ -10,16 +10,20 @@ Features:
 - Structured logging
 """
 import os
+import sys
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from dotenv import load_dotenv
 from slowapi.errors import RateLimitExceeded
 
-from db.database import init_db
-from db.migration import add_diagram_column
-from routes.api import router
+from db.database import init_db, close_db
+from db.migration import add_diagram_column, add_prompt_hash_column, add_performance_indexes
+from routes.api import router, plain_router, analysis_service
 from utils.rate_limiter import get_limiter
 from utils.logger import get_logger
 
@@ -30,55 +34,77 @@ load_dotenv()
 logger = get_logger(__name__)
 
 
+# Banner lines that never change between runs
+STARTUP_BANNER_STATIC = (
+    "",
+    "⚡ Architecture:",
+    "  ✅ Status-based async flow (Option A)",
+    "  ✅ Split table storage (normalized)",
+    "  ✅ Single Gemini call per repository",
+    "  ✅ Zero Gemini calls in /api/ask",
+    "  ✅ Proper SQLite persistence",
+    "  ✅ Idempotent Q&A operations",
+    "",
+    "🌐 Endpoints:",
+    "  POST   /api/analyze-repo     - Start analysis",
+    "  GET    /api/status/{id}      - Check status",
+    "  GET    /api/analysis/{id}    - Get results",
+    "  POST   /api/ask              - Ask questions",
+    "  GET    /api/health           - Health check",
+)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager with proper database initialization."""
     # Startup
-    print("=" * 80)
-    print("🚀 GitHub Repository Analyzer - Production")
-    print("=" * 80)
-    
-    print("\n📊 Initializing database...")
     await init_db()
     await add_diagram_column()   # safe no-op if column already exists
-    print("✅ Database initialized successfully")
+    await add_prompt_hash_column()   # safe no-op if column already exists
+    await add_performance_indexes()   # safe no-op if indexes already exist
     
-    # Print configuration
+    # Build the banner once and emit it in a single write instead of one
+    # print() (lock + syscall) per line.
     api_key = os.getenv("GEMINI_API_KEY")
     model = os.getenv("GEMINI_MODEL", "flash")
     
-    print("\n🤖 AI Configuration:")
     if api_key:
         model_name = "Gemini 3 Pro" if model.lower() == "pro" else "Gemini 3 Flash"
-        print(f"  ✅ {model_name} configured")
-        print(f"  ✅ API Key: {'*' * 20}{api_key[-8:]}")
+        ai_lines = [
+            f"  ✅ {model_name} configured",
+            f"  ✅ API Key: {'*' * 20}{api_key[-8:]}",
+        ]
     else:
-        print("  ⚠️  No GEMINI_API_KEY - using mock mode")
-        print("  💡 Set GEMINI_API_KEY in .env for AI analysis")
+        ai_lines = [
+            "  ⚠️  No GEMINI_API_KEY - using mock mode",
+            "  💡 Set GEMINI_API_KEY in .env for AI analysis",
+        ]
     
-    print("\n⚡ Architecture:")
-    print("  ✅ Status-based async flow (Option A)")
-    print("  ✅ Split table storage (normalized)")
-    print("  ✅ Single Gemini call per repository")
-    print("  ✅ Zero Gemini calls in /api/ask")
-    print("  ✅ Proper SQLite persistence")
-    print("  ✅ Idempotent Q&A operations")
-    
-    print("\n🌐 Endpoints:")
-    print("  POST   /api/analyze-repo     - Start analysis")
-    print("  GET    /api/status/{id}      - Check status")
-    print("  GET    /api/analysis/{id}    - Get results")
-    print("  POST   /api/ask              - Ask questions")
-    print("  GET    /api/health           - Health check")
-    
-    print("\n" + "=" * 80)
-    print("✅ Application started successfully")
-    print("=" * 80 + "\n")
+    banner = [
+        "=" * 80,
+        "🚀 GitHub Repository Analyzer - Production",
+        "=" * 80,
+        "",
+        "📊 Database initialized successfully",
+        "",
+        "🤖 AI Configuration:",
+        *ai_lines,
+        *STARTUP_BANNER_STATIC,
+        "",
+        "=" * 80,
+        "✅ Application started successfully",
+        "=" * 80,
+        "",
+    ]
+    sys.stdout.write("\n".join(banner) + "\n")
+    sys.stdout.flush()
     
     yield
     
     # Shutdown
     print("\n👋 Application shutting down...")
+    await analysis_service.close()
+    await close_db()
 
 
 # Create FastAPI app
@@ -86,7 +112,8 @@ app = FastAPI(
     title="GitHub Repository Analyzer - Production",
     description="Hardened system with proper async flow and guaranteed persistence",
     version="3.0.0-final",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add rate limiter
@@ -101,44 +128,61 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
         content={"detail": "Rate limit exceeded. Please try again later."}
     )
 
-# Add CORS middleware
+# Compress larger JSON bodies (e.g. /api/analysis); small responses pass through
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Add CORS middleware. CORS_ORIGINS is a comma-separated allow-list; explicit
+# lists are set-membership checks, and max_age lets browsers cache preflights.
+cors_origins = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
+    allow_origins=cors_origins or ["*"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,
 )
 
 # Include API routes
 app.include_router(router, prefix="/api", tags=["analysis"])
+app.include_router(plain_router, prefix="/api")
 
 # Include WebSocket routes
 from routes.websocket import router as ws_router
 app.include_router(ws_router, tags=["websocket"])
 
 # Serve index.html at root and for SPA routing (all non-API routes)
-@app.get("/")
+INDEX_PATH = os.path.join(os.path.dirname(__file__), "index.html")
+
+
+@lru_cache(maxsize=1)
+def _index_html() -> Optional[bytes]:
+    """Read index.html once; it only changes on deploy."""
+    if not os.path.exists(INDEX_PATH):
+        return None
+    with open(INDEX_PATH, "rb") as f:
+        return f.read()
+
+
+@app.get("/", include_in_schema=False)
 async def serve_root():
     """Serve index.html at root."""
-    import os
-    index_path = os.path.join(os.path.dirname(__file__), "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path, media_type="text/html")
+    content = _index_html()
+    if content is not None:
+        return Response(content=content, media_type="text/html")
     return {"error": "index.html not found"}
 
 
-@app.get("/{path:path}")
+@app.get("/{path:path}", include_in_schema=False)
 async def serve_spa(path: str):
     """Serve index.html for SPA routing (catch-all for non-API, non-static routes)."""
     # Skip if it looks like an API call or static asset with extension
     if path.startswith("api") or "." in path.split("/")[-1]:
         return JSONResponse({"error": "Not found"}, status_code=404)
     
-    import os
-    index_path = os.path.join(os.path.dirname(__file__), "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path, media_type="text/html")
+    content = _index_html()
+    if content is not None:
+        return Response(content=content, media_type="text/html")
     return JSONResponse({"error": "index.html not found"}, status_code=404)
 
 
@@ -148,11 +192,28 @@ if __name__ == "__main__":
     # Use PORT from environment (Railway/Heroku) or default to 8000 for local dev
     port = int(os.getenv("PORT", 8000))
     
+    # Auto-reload stays on for local dev; set UVICORN_RELOAD=false in production
+    # to run multiple worker processes on uvloop + httptools.
+    reload = os.getenv("UVICORN_RELOAD", "true").lower() in ("1", "true", "yes")
+    
+    if reload:
+        workers = 1
+    else:
+        workers = int(
+            os.getenv("WEB_CONCURRENCY")
+            or os.getenv("UVICORN_WORKERS")
+            or 2 * (os.cpu_count() or 1) + 1
+        )
+    
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
-        reload_dirs=["routes", "services", "models", "utils", "db"],
+        reload=reload,
+        reload_dirs=["routes", "services", "models", "utils", "db"] if reload else None,
+        workers=workers,
+        # uvloop has no Windows build; "auto" falls back to asyncio there
+        loop="uvloop" if not reload and sys.platform != "win32" else "auto",
+        http="httptools",
         log_level="info"
     )
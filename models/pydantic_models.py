@@ -1,27 +1,39 @@
 """
 Pydantic models for API request and response validation.
 """
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field
 from typing import Optional, List
 from datetime import datetime
 
 
+# Request/response payloads are never mutated after validation
+FROZEN_CONFIG = ConfigDict(extra="ignore", frozen=True, str_strip_whitespace=True)
+
+
 class AnalyzeRepoRequest(BaseModel):
+    model_config = FROZEN_CONFIG
+
     repo_url: str = Field(..., description="GitHub repository URL")
 
 
 class AnalyzeRepoResponse(BaseModel):
+    model_config = FROZEN_CONFIG
+
     repo_id: str
     status: str
     message: str
 
 
 class AskQuestionRequest(BaseModel):
+    model_config = FROZEN_CONFIG
+
     repo_id: str
     question: str
 
 
 class AskQuestionResponse(BaseModel):
+    model_config = FROZEN_CONFIG
+
     repo_id: str
     question: str
     answer: str
@@ -2,9 +2,11 @@
 Production V2 Database Models - Split Table Architecture
 Stores data in normalized tables for better queries and flexibility.
 """
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Float, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Float, Integer, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.database import Base
+from db.types import CompactJSON
 
 
 # ============================================================================
@@ -20,16 +22,31 @@ class Repository(Base):
     name = Column(Text, nullable=False)
     primary_language = Column(Text)
     created_at = Column(DateTime)
-    analyzed_at = Column(DateTime)
+    analyzed_at = Column(DateTime, server_default=func.now())
+    
+    # Read-side relationships for loading an analysis in one pass
+    # (selectinload/joinedload). Rows are still written by repo_id directly.
+    summary = relationship("AnalysisSummary", uselist=False, viewonly=True)
+    tech_stack = relationship("TechStack", viewonly=True)
+    components = relationship("ArchitectureComponent", viewonly=True)
+    key_files = relationship("KeyFile", viewonly=True)
+    setup_steps = relationship("SetupStep", order_by="SetupStep.step_order", viewonly=True)
+    contribution_areas = relationship("ContributionArea", viewonly=True)
+    risky_areas = relationship("RiskyArea", viewonly=True)
+    known_issues = relationship("KnownIssue", viewonly=True)
 
 
 class AnalysisSession(Base):
     __tablename__ = "analysis_sessions"
+    __table_args__ = (
+        # Serves get_status(): latest session per repo (ORDER BY started_at DESC)
+        Index("ix_analysis_sessions_repo_started", "repo_id", "started_at"),
+    )
     
     id = Column(Text, primary_key=True)
     repo_id = Column(Text, ForeignKey("repositories.id"), nullable=False, index=True)
     status = Column(Text, nullable=False, index=True)  # processing|completed|failed
-    started_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=False, server_default=func.now())
     completed_at = Column(DateTime)
     error_message = Column(Text)
     gemini_call_count = Column(Integer, default=0)  # Track API calls made
@@ -81,7 +98,7 @@ class ArchitectureComponent(Base):
     repo_id = Column(Text, ForeignKey("repositories.id"), nullable=False, index=True)
     name = Column(Text, nullable=False)
     purpose = Column(Text, nullable=False)
-    key_files = Column(Text)  # JSON array as text
+    key_files = Column(CompactJSON)  # list of file paths
 
 
 class KeyFile(Base):
@@ -138,6 +155,11 @@ class KnownIssue(Base):
 
 class QALog(Base):
     __tablename__ = "qa_logs"
+    __table_args__ = (
+        Index("ix_qa_repo_question", "repo_id", "question"),
+    )
+    # Fetch the DB-generated created_at via RETURNING on insert
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Text, primary_key=True)
     repo_id = Column(Text, ForeignKey("repositories.id"), nullable=False, index=True)
@@ -155,7 +177,8 @@ class RawAnalysisResponse(Base):
     __tablename__ = "raw_analysis_responses"
     
     repo_id = Column(Text, ForeignKey("repositories.id"), primary_key=True)
-    raw_json = Column(Text, nullable=False)  # Complete Pydantic model as JSON
+    raw_json = Column(CompactJSON, nullable=False)  # Complete Pydantic model as dict
     prompt_used = Column(Text)  # Store prompt for reproducibility
     model_version = Column(Text)  # gemini-3-flash-preview or pro
+    prompt_hash = Column(Text)  # sha256(model + prompt); identical inputs reuse raw_json
     created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
@@ -2,7 +2,10 @@
 Production API Routes - Hardened with proper async flow and persistence.
 Implements Option A: Status-based async flow.
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+import re
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import BaseModel
@@ -16,41 +19,52 @@ from services.analysis_service import AnalysisServiceFinal
 from services.comparative_service import ComparativeAnalysisService
 from services.code_quality_service import CodeQualityAnalyzer
 from utils.rate_limiter import get_limiter
+from utils.logger import get_logger
 
 router = APIRouter()
+# Dependency-free endpoints (health probes); returns prebuilt bytes directly
+plain_router = APIRouter(default_response_class=Response)
 analysis_service = AnalysisServiceFinal()
 comparative_service = ComparativeAnalysisService()
 code_quality_analyzer = CodeQualityAnalyzer()
 limiter = get_limiter()
+logger = get_logger(__name__)
+
+# Compiled once at import; accepts the same forms as GitHubService.parse_repo_url,
+# including deep links (/tree/main, /issues/3) and query strings or fragments
+_GH_RE = re.compile(r"^(?:https?://)?(?:www\.)?github\.com/([^/?#]+)/([^/?#]+?)(?:\.git)?(?:[/?#].*)?$")
 
 
-@router.post("/analyze-repo", response_model=AnalyzeRepoResponse)
+@router.post("/analyze-repo", response_model=AnalyzeRepoResponse, status_code=202)
 async def analyze_repo(
     request: AnalyzeRepoRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    response: Response
 ):
     """
     Start repository analysis (returns immediately with status='processing').
     
     Flow:
-    1. Validate URL
+    1. Validate URL and extract owner/repo in one regex match
     2. Create repo + analysis_session with status='processing'
     3. Commit to database
-    4. Return immediately with repo_id and status
+    4. Return 202 Accepted with repo_id, a Location header pointing at the
+       status endpoint, and a Retry-After polling hint
     5. Background task does actual analysis
     """
+    m = _GH_RE.match(request.repo_url.strip())
+    if not m:
+        raise HTTPException(status_code=400, detail="Invalid GitHub URL")
+    owner, repo_name = m.group(1), m.group(2)
+    
     try:
-        # Validate URL
-        if not request.repo_url or 'github.com' not in request.repo_url:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid GitHub repository URL"
+        # Start analysis (synchronous setup). The session is scoped to just this
+        # call so no pooled connection is held while the response is sent.
+        async with async_session_maker() as db:
+            result = await analysis_service.start_analysis(
+                request.repo_url, db, owner=owner, repo_name=repo_name
             )
         
-        # Start analysis (synchronous setup)
-        result = await analysis_service.start_analysis(request.repo_url, db)
-        
         repo_id = result['repo_id']
         
         # Background task for actual analysis (with NEW session)
@@ -62,13 +76,14 @@ async def analyze_repo(
             async with async_session_maker() as bg_db:
                 try:
                     await analysis_service.execute_analysis(repo_id, bg_db)
-                except Exception as e:
-                    print(f"Background analysis error: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                except Exception:
+                    logger.exception("Background analysis failed", repo_id=repo_id)
         
         background_tasks.add_task(background_analysis)
         
+        response.headers["Location"] = f"/api/status/{repo_id}"
+        response.headers["Retry-After"] = "2"
+        
         return AnalyzeRepoResponse(
             repo_id=repo_id,
             status="processing",
@@ -116,6 +131,8 @@ async def get_analysis_status(
 @router.get("/analysis/{repo_id}")
 async def get_analysis(
     repo_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -125,9 +142,17 @@ async def get_analysis(
     - Analysis must be completed (status='completed')
     - Returns frontend-ready structured JSON
     - ZERO Gemini calls (reads from database only)
+    - Sends an ETag; a matching If-None-Match returns 304 with no body
     """
     try:
-        analysis = await analysis_service.get_analysis(repo_id, db)
+        status = await analysis_service.get_status(repo_id, db)
+        if status['status'] == 'completed':
+            etag = analysis_service.analysis_etag(repo_id, status)
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        
+        analysis = await analysis_service.get_analysis(repo_id, db, status=status)
         return analysis
     except ValueError as e:
         # Analysis not completed or not found
@@ -200,26 +225,30 @@ async def ask_question(
         )
 
 
-@router.get("/health")
+# Static health payload, serialized once at import
+HEALTH_RESPONSE = orjson.dumps({
+    "status": "healthy",
+    "service": "repo-analyzer-final",
+    "architecture": "production",
+    "features": {
+        "single_gemini_call": True,
+        "split_table_storage": True,
+        "status_based_async": True,
+        "proper_persistence": True,
+        "idempotent_qa": True,
+        "websocket_support": True,
+        "code_quality_analysis": True,
+        "comparative_analysis": True,
+        "rate_limiting": True,
+        "caching": True
+    }
+})
+
+
+@plain_router.get("/health", include_in_schema=False)
 async def health_check():
     """Health check endpoint with system info."""
-    return {
-        "status": "healthy",
-        "service": "repo-analyzer-final",
-        "architecture": "production",
-        "features": {
-            "single_gemini_call": True,
-            "split_table_storage": True,
-            "status_based_async": True,
-            "proper_persistence": True,
-            "idempotent_qa": True,
-            "websocket_support": True,
-            "code_quality_analysis": True,
-            "comparative_analysis": True,
-            "rate_limiting": True,
-            "caching": True
-        }
-    }
+    return Response(content=HEALTH_RESPONSE, media_type="application/json")
 
 
 # Pydantic models for new endpoints
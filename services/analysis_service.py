@@ -6,11 +6,12 @@ Guarantees:
 - Status-based async flow
 - Data persists across restarts
 """
-import uuid
-import json
+import asyncio
 from datetime import datetime
 from typing import Dict, Optional, List
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.schemas import (
@@ -23,7 +24,13 @@ from services.github_service import GitHubService
 from services.gemini_service import GeminiServiceV2, RepositoryAnalysis
 from services.dependency_analyzer import DependencyAnalyzer
 from services.diagram_generator import DiagramGenerator
+from services.cache_service import get_cache
 from utils.file_filter import FileFilter
+from utils.ids import uuid7, uuid7_batch
+from utils.logger import get_logger
+
+
+SOURCE_ROLES = frozenset({'source_code', 'entry_point'})
 
 
 class AnalysisServiceFinal:
@@ -37,52 +44,59 @@ class AnalysisServiceFinal:
         self.file_filter = FileFilter()
         self.dependency_analyzer = DependencyAnalyzer()
         self.diagram_generator = DiagramGenerator()
+        self.cache = get_cache()
+        self.logger = get_logger(__name__)
     
-    async def start_analysis(self, repo_url: str, db: AsyncSession) -> Dict:
+    async def close(self):
+        """Release shared HTTP connections (called on app shutdown)."""
+        await self.github.close()
+    
+    async def start_analysis(
+        self,
+        repo_url: str,
+        db: AsyncSession,
+        owner: Optional[str] = None,
+        repo_name: Optional[str] = None
+    ) -> Dict:
         """
         Start repository analysis (synchronous setup + background work).
         
         Returns immediately with repo_id and status='processing'.
-        Actual analysis happens in background.
+        Actual analysis happens in background. Callers that have already
+        validated the URL can pass owner/repo_name to skip re-parsing it.
         """
         # Parse URL
-        try:
-            owner, repo_name = self.github.parse_repo_url(repo_url)
-        except ValueError as e:
-            raise ValueError(f"Invalid repository URL: {str(e)}")
-        
-        # Check if repository exists
-        result = await db.execute(
-            select(Repository).where(Repository.repo_url == repo_url)
+        if owner is None or repo_name is None:
+            try:
+                owner, repo_name = self.github.parse_repo_url(repo_url)
+            except ValueError as e:
+                raise ValueError(f"Invalid repository URL: {str(e)}")
+        
+        # Get-or-create the repository in one statement (SQLite UPSERT).
+        # The no-op update on conflict makes RETURNING yield the existing id,
+        # and closes the race between concurrent requests for the same URL.
+        stmt = sqlite_insert(Repository).values(
+            id=uuid7(),
+            repo_url=repo_url,
+            owner=owner,
+            name=repo_name,
+            analyzed_at=func.now()
         )
-        existing_repo = result.scalar_one_or_none()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Repository.repo_url],
+            set_={"repo_url": stmt.excluded.repo_url}
+        ).returning(Repository.id)
         
-        if existing_repo:
-            repo_id = existing_repo.id
-        else:
-            repo_id = str(uuid.uuid4())
-            
-            # Create minimal repository record
-            repository = Repository(
-                id=repo_id,
-                repo_url=repo_url,
-                owner=owner,
-                name=repo_name,
-                analyzed_at=datetime.utcnow()
-            )
-            db.add(repository)
-            
-            # CRITICAL: Flush to ensure repository exists before creating session
-            # This prevents FOREIGN KEY constraint errors
-            await db.flush()
+        result = await db.execute(stmt)
+        repo_id = result.scalar_one()
         
         # Create analysis session with 'processing' status
-        session_id = str(uuid.uuid4())
+        session_id = uuid7()
         session = AnalysisSession(
             id=session_id,
             repo_id=repo_id,
             status="processing",
-            started_at=datetime.utcnow(),
+            started_at=func.now(),
             gemini_call_count=0
         )
         db.add(session)
@@ -127,7 +141,8 @@ class AnalysisServiceFinal:
         result = await db.execute(
             select(AnalysisSession)
             .where(AnalysisSession.repo_id == repo_id)
-            .order_by(AnalysisSession.started_at.desc())
+            # started_at has second resolution; time-ordered ids break ties
+            .order_by(AnalysisSession.started_at.desc(), AnalysisSession.id.desc())
         )
         session = result.scalars().first()
         
@@ -135,52 +150,76 @@ class AnalysisServiceFinal:
             print(f"✗ Analysis session not found for: {repo_id}")
             return
         
+        # Stored response from the previous run (reused if inputs are unchanged)
+        result = await db.execute(
+            select(RawAnalysisResponse.raw_json, RawAnalysisResponse.prompt_hash)
+            .where(RawAnalysisResponse.repo_id == repo_id)
+        )
+        stored_raw_json, stored_prompt_hash = result.first() or (None, None)
+        
+        # Captured up front: after a rollback the ORM instance is expired and
+        # reading attributes from it would trigger a lazy load.
+        session_id = session.id
+        owner = repo.owner
+        repo_name = repo.name
+        
+        # End the read transaction: nothing below touches the database until
+        # STEP 4, so no connection or snapshot is held during network calls.
+        await db.commit()
+        
         try:
             # ================================================================
             # STEP 1: Fetch GitHub data (no LLM calls)
             # ================================================================
             
-            owner = repo.owner
-            repo_name = repo.name
-            
             print(f"📥 Fetching GitHub data for {owner}/{repo_name}...")
             
+            # Metadata first: it raises for missing repos / rate limits.
+            # The remaining requests are independent, so run them concurrently.
             metadata = await self.github.get_repo_metadata(owner, repo_name)
-            readme = await self.github.get_readme(owner, repo_name)
-            tree = await self.github.get_repository_tree(owner, repo_name)
+            readme, tree, (open_issues, closed_issues) = await asyncio.gather(
+                self.github.get_readme(owner, repo_name),
+                self.github.get_repository_tree(owner, repo_name, metadata.get('default_branch')),
+                self.github.get_issue_lists(owner, repo_name, max_open=30, max_closed=20)
+            )
             important_files = self.file_filter.filter_important_files(tree, max_files=30)
             
-            # Fetch limited file contents
-            file_contents = {}
-            prioritized_files = self._prioritize_files_for_content(important_files)
-            for file_info in prioritized_files[:20]:
-                content = await self.github.get_file_content(owner, repo_name, file_info['path'])
-                if content:
-                    file_contents[file_info['path']] = content[:10000]
-            
-            # Fetch issues
-            open_issues = await self.github.get_issues(owner, repo_name, state="open", max_issues=30)
-            closed_issues = await self.github.get_issues(owner, repo_name, state="closed", max_issues=20)
+            # Fetch limited file contents (concurrency bounded in GitHubService)
+            prioritized_paths = [
+                f['path'] for f in self._prioritize_files_for_content(important_files)[:20]
+            ]
+            contents = await asyncio.gather(*(
+                self.github.get_file_content(owner, repo_name, path)
+                for path in prioritized_paths
+            ))
+            file_contents = {
+                path: content[:10000]
+                for path, content in zip(prioritized_paths, contents)
+                if content
+            }
             
             print(f"✓ GitHub data fetched: {len(important_files)} files, {len(open_issues)} open issues")
             
-            # Update repository metadata
-            repo.primary_language = metadata.get('language')
-            if metadata.get('created_at'):
-                repo.created_at = datetime.fromisoformat(metadata['created_at'].replace('Z', '+00:00'))
-            repo.analyzed_at = datetime.utcnow()
-            
             # ================================================================
             # STEP 2: Build context for Gemini
             # ================================================================
             
+            # Split files by role in a single pass
+            config_files, source_files = [], []
+            for f in important_files:
+                role = f['role']
+                if role == 'configuration':
+                    config_files.append(f)
+                elif role in SOURCE_ROLES:
+                    source_files.append(f)
+            
             context = {
                 'repo_name': f"{owner}/{repo_name}",
                 'primary_language': metadata.get('language'),
                 'readme': readme,
                 'files': important_files,
-                'config_files': [f for f in important_files if f['role'] == 'configuration'],
-                'source_files': [f for f in important_files if f['role'] in ['source_code', 'entry_point']],
+                'config_files': config_files,
+                'source_files': source_files,
                 'file_contents': file_contents,
                 'open_issues': open_issues,
                 'closed_issues': closed_issues,
@@ -192,10 +231,22 @@ class AnalysisServiceFinal:
             # STEP 3: SINGLE GEMINI API CALL
             # ================================================================
             
-            print(f"🤖 Making SINGLE Gemini API call for {owner}/{repo_name}...")
-            session.gemini_call_count += 1
+            prompt = self.gemini.build_prompt(context)
+            prompt_hash = self.gemini.prompt_hash(prompt)
+            gemini_calls = 0
             
-            analysis: RepositoryAnalysis = await self.gemini.analyze_repository(context)
+            if stored_raw_json and stored_prompt_hash == prompt_hash:
+                # Same model + same inputs as the stored response: reuse it
+                print(f"♻️  Inputs unchanged, reusing stored analysis for {owner}/{repo_name}")
+                analysis = RepositoryAnalysis(**stored_raw_json)
+            else:
+                print(f"🤖 Making SINGLE Gemini API call for {owner}/{repo_name}...")
+                gemini_calls = 1
+                
+                analysis = await self.gemini.generate_analysis(prompt)
+                if analysis is None:
+                    analysis = self.gemini.fallback_analysis(context)
+                    prompt_hash = None  # never reuse a fallback
             
             print(f"✓ Received structured analysis (confidence: {analysis.confidence_score})")
 
@@ -212,212 +263,128 @@ class AnalysisServiceFinal:
             print("✓ Mermaid diagram generated")
             
             # ================================================================
-            # STEP 4: Store in database (split tables)
+            # STEP 4: Store in database (split tables) - ONE transaction
             # ================================================================
             
             print(f"💾 Storing analysis in database...")
             
-            # 1. Summary
-            result = await db.execute(
-                select(AnalysisSummary).where(AnalysisSummary.repo_id == repo_id)
-            )
-            existing_summary = result.scalar_one_or_none()
-            
-            if existing_summary:
-                # Update existing
-                existing_summary.summary = analysis.summary
-                existing_summary.purpose = analysis.purpose
-                existing_summary.architecture_pattern = analysis.architecture_pattern
-                existing_summary.data_flow = analysis.data_flow
-                existing_summary.confidence_score = analysis.confidence_score
-                existing_summary.architecture_diagram_mermaid = diagram_syntax
-                existing_summary.updated_at = datetime.utcnow()
-            else:
-                # Create new
-                summary = AnalysisSummary(
+            async with db.begin():
+                # Repository metadata
+                repo.primary_language = metadata.get('language')
+                if metadata.get('created_at'):
+                    repo.created_at = datetime.fromisoformat(metadata['created_at'].replace('Z', '+00:00'))
+                repo.analyzed_at = func.now()
+                
+                # 1. Summary (single UPSERT on repo_id instead of SELECT + INSERT/UPDATE)
+                summary_values = {
+                    "summary": analysis.summary,
+                    "purpose": analysis.purpose,
+                    "architecture_pattern": analysis.architecture_pattern,
+                    "data_flow": analysis.data_flow,
+                    "confidence_score": analysis.confidence_score,
+                    "architecture_diagram_mermaid": diagram_syntax,
+                }
+                stmt = sqlite_insert(AnalysisSummary).values(repo_id=repo_id, **summary_values)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[AnalysisSummary.repo_id],
+                    # Core UPSERT bypasses the ORM onupdate hook
+                    set_={**summary_values, "updated_at": func.now()}
+                ))
+                
+                # 2-8. Child tables: replace each set with one DELETE and one
+                # executemany INSERT rather than per-row ORM deletes/adds.
+                await self._replace_rows(db, TechStack, repo_id, [
+                    {"name": t.name, "category": t.category, "version": t.version}
+                    for t in analysis.tech_stack
+                ])
+                await self._replace_rows(db, ArchitectureComponent, repo_id, [
+                    {"name": c.name, "purpose": c.purpose, "key_files": c.files}
+                    for c in analysis.components
+                ])
+                await self._replace_rows(db, KeyFile, repo_id, [
+                    {"file_path": f.path, "role": f.role, "purpose": f.purpose}
+                    for f in analysis.key_files
+                ])
+                await self._replace_rows(db, SetupStep, repo_id, [
+                    {"step_order": i + 1, "instruction": step}
+                    for i, step in enumerate(analysis.setup_steps)
+                ])
+                await self._replace_rows(db, ContributionArea, repo_id, [
+                    {"area": area} for area in analysis.contribution_areas
+                ])
+                await self._replace_rows(db, RiskyArea, repo_id, [
+                    {"area": area} for area in analysis.risky_areas
+                ])
+                await self._replace_rows(db, KnownIssue, repo_id, [
+                    {"issue": issue} for issue in analysis.known_issues
+                ])
+                
+                # 9. Raw Response (for debugging, and reuse keyed by prompt_hash)
+                stmt = sqlite_insert(RawAnalysisResponse).values(
                     repo_id=repo_id,
-                    summary=analysis.summary,
-                    purpose=analysis.purpose,
-                    architecture_pattern=analysis.architecture_pattern,
-                    data_flow=analysis.data_flow,
-                    confidence_score=analysis.confidence_score,
-                    architecture_diagram_mermaid=diagram_syntax,
+                    raw_json=analysis.dict(),
+                    model_version=self.gemini.model_name or "mock",
+                    prompt_hash=prompt_hash
                 )
-                db.add(summary)
-            
-            # 2. Tech Stack (delete old, insert new)
-            await db.execute(
-                select(TechStack).where(TechStack.repo_id == repo_id)
-            )
-            # Delete existing
-            result = await db.execute(
-                select(TechStack).where(TechStack.repo_id == repo_id)
-            )
-            for old_tech in result.scalars():
-                await db.delete(old_tech)
-            
-            # Insert new
-            for tech_item in analysis.tech_stack:
-                tech = TechStack(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    name=tech_item.name,
-                    category=tech_item.category,
-                    version=tech_item.version
-                )
-                db.add(tech)
-            
-            # 3. Components
-            result = await db.execute(
-                select(ArchitectureComponent).where(ArchitectureComponent.repo_id == repo_id)
-            )
-            for old_comp in result.scalars():
-                await db.delete(old_comp)
-            
-            for comp in analysis.components:
-                component = ArchitectureComponent(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    name=comp.name,
-                    purpose=comp.purpose,
-                    key_files=json.dumps(comp.files)
-                )
-                db.add(component)
-            
-            # 4. Key Files
-            result = await db.execute(
-                select(KeyFile).where(KeyFile.repo_id == repo_id)
-            )
-            for old_file in result.scalars():
-                await db.delete(old_file)
-            
-            for file_item in analysis.key_files:
-                key_file = KeyFile(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    file_path=file_item.path,
-                    role=file_item.role,
-                    purpose=file_item.purpose
-                )
-                db.add(key_file)
-            
-            # 5. Setup Steps
-            result = await db.execute(
-                select(SetupStep).where(SetupStep.repo_id == repo_id)
-            )
-            for old_step in result.scalars():
-                await db.delete(old_step)
-            
-            for i, step in enumerate(analysis.setup_steps):
-                setup_step = SetupStep(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    step_order=i + 1,
-                    instruction=step
-                )
-                db.add(setup_step)
-            
-            # 6. Contribution Areas
-            result = await db.execute(
-                select(ContributionArea).where(ContributionArea.repo_id == repo_id)
-            )
-            for old_area in result.scalars():
-                await db.delete(old_area)
-            
-            for area in analysis.contribution_areas:
-                contrib_area = ContributionArea(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    area=area
-                )
-                db.add(contrib_area)
-            
-            # 7. Risky Areas
-            result = await db.execute(
-                select(RiskyArea).where(RiskyArea.repo_id == repo_id)
-            )
-            for old_risky in result.scalars():
-                await db.delete(old_risky)
-            
-            for risky in analysis.risky_areas:
-                risky_area = RiskyArea(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    area=risky
-                )
-                db.add(risky_area)
-            
-            # 8. Known Issues
-            result = await db.execute(
-                select(KnownIssue).where(KnownIssue.repo_id == repo_id)
-            )
-            for old_issue in result.scalars():
-                await db.delete(old_issue)
-            
-            for issue in analysis.known_issues:
-                known_issue = KnownIssue(
-                    id=str(uuid.uuid4()),
-                    repo_id=repo_id,
-                    issue=issue
-                )
-                db.add(known_issue)
-            
-            # 9. Raw Response (for debugging)
-            result = await db.execute(
-                select(RawAnalysisResponse).where(RawAnalysisResponse.repo_id == repo_id)
-            )
-            existing_raw = result.scalar_one_or_none()
-            
-            if existing_raw:
-                existing_raw.raw_json = analysis.json()
-                existing_raw.model_version = self.gemini.model_name or "mock"
-                existing_raw.created_at = datetime.utcnow()
-            else:
-                raw_response = RawAnalysisResponse(
-                    repo_id=repo_id,
-                    raw_json=analysis.json(),
-                    model_version=self.gemini.model_name or "mock"
-                )
-                db.add(raw_response)
-            
-            # ================================================================
-            # STEP 5: Mark session as completed
-            # ================================================================
-            
-            session.status = "completed"
-            session.completed_at = datetime.utcnow()
-            
-            # CRITICAL: Commit everything
-            try:
-                await db.commit()
-                print(f"✓ Analysis committed to database successfully")
-                print(f"✓ Gemini calls made: {session.gemini_call_count}")
-            except Exception as commit_error:
-                await db.rollback()
-                print(f"✗ Database commit failed: {str(commit_error)}")
-                raise
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[RawAnalysisResponse.repo_id],
+                    set_={
+                        "raw_json": stmt.excluded.raw_json,
+                        "model_version": stmt.excluded.model_version,
+                        "prompt_hash": stmt.excluded.prompt_hash,
+                        "created_at": func.now()
+                    }
+                ))
+                
+                # STEP 5: Mark session as completed (committed with the data)
+                session.gemini_call_count += gemini_calls
+                session.status = "completed"
+                session.completed_at = datetime.utcnow()
+            
+            print(f"✓ Analysis committed to database successfully")
+            print(f"✓ Gemini calls made: {session.gemini_call_count}")
             
             print(f"{'='*70}")
             print(f"BACKGROUND ANALYSIS COMPLETE: {owner}/{repo_name}")
             print(f"{'='*70}\n")
             
         except Exception as e:
-            # Mark session as failed
-            session.status = "failed"
-            session.error_message = str(e)
-            session.completed_at = datetime.utcnow()
+            # Discard whatever the failed run left pending (a failed flush
+            # leaves the session unusable until rolled back), then mark the
+            # session as failed with a single UPDATE.
+            await db.rollback()
             
             try:
+                await db.execute(
+                    update(AnalysisSession)
+                    .where(AnalysisSession.id == session_id)
+                    .values(
+                        status="failed",
+                        error_message=str(e),
+                        completed_at=datetime.utcnow()
+                    )
+                )
                 await db.commit()
                 print(f"✗ Analysis failed and marked in database: {str(e)}")
-            except:
+            except Exception:
                 await db.rollback()
                 print(f"✗ Failed to mark error in database")
             
-            print(f"✗ Background analysis error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception("Background analysis failed", repo_id=repo_id)
 
+    @staticmethod
+    async def _replace_rows(db: AsyncSession, model, repo_id: str, rows: List[Dict]) -> None:
+        """Replace all of a repository's rows in a child table (one DELETE + one INSERT)."""
+        await db.execute(delete(model).where(model.repo_id == repo_id))
+        if rows:
+            await db.execute(
+                insert(model),
+                [
+                    {"id": row_id, "repo_id": repo_id, **row}
+                    for row_id, row in zip(uuid7_batch(len(rows)), rows)
+                ]
+            )
+    
     def _prioritize_files_for_content(self, files: List[Dict]) -> List[Dict]:
         """Prioritize entry points and config files before other sources."""
         entry_points = [f for f in files if f.get('role') == 'entry_point']
@@ -473,7 +440,8 @@ class AnalysisServiceFinal:
         result = await db.execute(
             select(AnalysisSession)
             .where(AnalysisSession.repo_id == repo_id)
-            .order_by(AnalysisSession.started_at.desc())
+            # started_at has second resolution; time-ordered ids break ties
+            .order_by(AnalysisSession.started_at.desc(), AnalysisSession.id.desc())
         )
         session = result.scalars().first()
         
@@ -488,78 +456,80 @@ class AnalysisServiceFinal:
             "error_message": session.error_message
         }
     
-    async def get_analysis(self, repo_id: str, db: AsyncSession) -> Dict:
+    @staticmethod
+    def analysis_etag(repo_id: str, status: Dict) -> str:
+        """Weak ETag for a completed analysis; changes whenever it is re-run."""
+        return f'W/"{repo_id}:{status["completed_at"]}"'
+    
+    async def get_analysis(self, repo_id: str, db: AsyncSession, status: Optional[Dict] = None) -> Dict:
         """
         Retrieve complete analysis from database.
         ZERO Gemini calls - reads only from stored data.
+        
+        Results are cached per repo_id and tagged with completed_at; a finished
+        re-analysis replaces the stale entry on the next read. Pass `status`
+        if the caller already fetched it. The returned dict is shared with the
+        cache and must not be mutated.
         """
         # Check status first
-        status_result = await self.get_status(repo_id, db)
+        status_result = status or await self.get_status(repo_id, db)
         
         if status_result['status'] != 'completed':
             raise ValueError(f"Analysis not completed (status: {status_result['status']})")
         
-        # Fetch all data from split tables
-        summary_result = await db.execute(
-            select(AnalysisSummary).where(AnalysisSummary.repo_id == repo_id)
+        cache_key = self.cache._generate_key("analysis", repo_id)
+        cached = await self.cache.get(cache_key)
+        if cached and cached['completed_at'] == status_result['completed_at']:
+            return cached['data']
+        
+        data = await self._load_analysis(repo_id, db)
+        await self.cache.set(
+            cache_key,
+            {'completed_at': status_result['completed_at'], 'data': data},
+            ttl=3600
+        )
+        return data
+    
+    async def _load_analysis(self, repo_id: str, db: AsyncSession) -> Dict:
+        """Read a completed analysis from the split tables."""
+        # One query for the repository + summary, then one IN (...) query
+        # per child table instead of a round-trip per table.
+        result = await db.execute(
+            select(Repository)
+            .where(Repository.id == repo_id)
+            .options(
+                joinedload(Repository.summary),
+                selectinload(Repository.tech_stack),
+                selectinload(Repository.components),
+                selectinload(Repository.key_files),
+                selectinload(Repository.setup_steps),
+                selectinload(Repository.contribution_areas),
+                selectinload(Repository.risky_areas),
+                selectinload(Repository.known_issues),
+            )
         )
-        summary = summary_result.scalar_one_or_none()
+        repo = result.unique().scalar_one_or_none()
+        summary = repo.summary if repo else None
         
         if not summary:
             raise ValueError("Analysis data not found")
         
-        # Tech stack
-        tech_result = await db.execute(
-            select(TechStack).where(TechStack.repo_id == repo_id)
-        )
         tech_stack = [
             {"name": t.name, "category": t.category, "version": t.version}
-            for t in tech_result.scalars()
+            for t in repo.tech_stack
         ]
-        
-        # Components
-        comp_result = await db.execute(
-            select(ArchitectureComponent).where(ArchitectureComponent.repo_id == repo_id)
-        )
         components = [
-            {"name": c.name, "purpose": c.purpose, "files": json.loads(c.key_files) if c.key_files else []}
-            for c in comp_result.scalars()
+            {"name": c.name, "purpose": c.purpose, "files": c.key_files or []}
+            for c in repo.components
         ]
-        
-        # Key files
-        files_result = await db.execute(
-            select(KeyFile).where(KeyFile.repo_id == repo_id)
-        )
         key_files = [
             {"path": f.file_path, "role": f.role, "purpose": f.purpose}
-            for f in files_result.scalars()
+            for f in repo.key_files
         ]
-        
-        # Setup steps
-        steps_result = await db.execute(
-            select(SetupStep)
-            .where(SetupStep.repo_id == repo_id)
-            .order_by(SetupStep.step_order)
-        )
-        setup_steps = [s.instruction for s in steps_result.scalars()]
-        
-        # Contribution areas
-        contrib_result = await db.execute(
-            select(ContributionArea).where(ContributionArea.repo_id == repo_id)
-        )
-        contribution_areas = [c.area for c in contrib_result.scalars()]
-        
-        # Risky areas
-        risky_result = await db.execute(
-            select(RiskyArea).where(RiskyArea.repo_id == repo_id)
-        )
-        risky_areas = [r.area for r in risky_result.scalars()]
-        
-        # Known issues
-        issues_result = await db.execute(
-            select(KnownIssue).where(KnownIssue.repo_id == repo_id)
-        )
-        known_issues = [i.issue for i in issues_result.scalars()]
+        setup_steps = [s.instruction for s in repo.setup_steps]
+        contribution_areas = [c.area for c in repo.contribution_areas]
+        risky_areas = [r.area for r in repo.risky_areas]
+        known_issues = [i.issue for i in repo.known_issues]
         
         return {
             "repo_id": repo_id,
@@ -580,26 +550,17 @@ class AnalysisServiceFinal:
             "version": summary.analysis_version
         }
     
-    async def answer_question(self, repo_id: str, question: str, db: AsyncSession) -> Dict:
-        """
-        Answer question using stored analysis data + Gemini for intelligent responses.
-        Uses ONE Gemini call per question for better quality.
-        """
-        # Get stored analysis
-        analysis_data = await self.get_analysis(repo_id, db)
-        
-        # Reconstruct Pydantic model for Gemini
-        from services.gemini_service import RepositoryAnalysis
-        
-        # Get raw analysis response
+    async def _build_qa_context(self, repo_id: str, analysis_data: Dict, db: AsyncSession):
+        """Assemble the (RepositoryAnalysis, additional_context) pair used for Q&A."""
+        # Get raw analysis response (only the column we use)
         result = await db.execute(
-            select(RawAnalysisResponse).where(RawAnalysisResponse.repo_id == repo_id)
+            select(RawAnalysisResponse.raw_json).where(RawAnalysisResponse.repo_id == repo_id)
         )
-        raw_response = result.scalar_one_or_none()
+        raw_json = result.scalar_one_or_none()
         
-        if raw_response:
+        if raw_json:
             # Parse the stored Pydantic model
-            analysis_obj = RepositoryAnalysis(**json.loads(raw_response.raw_json))
+            analysis_obj = RepositoryAnalysis(**raw_json)
         else:
             # Fallback: construct from analysis_data
             from services.gemini_service import TechStackItem, ComponentItem, FileInsight
@@ -627,6 +588,31 @@ class AnalysisServiceFinal:
         ])
         
         additional_context = f"Key Files:\n{key_files_context}" if key_files_context else ""
+        return analysis_obj, additional_context
+    
+    async def answer_question(self, repo_id: str, question: str, db: AsyncSession) -> Dict:
+        """
+        Answer question using stored analysis data + Gemini for intelligent responses.
+        Uses ONE Gemini call per question for better quality.
+        """
+        # Context is cached per repo_id and tagged with completed_at like
+        # get_analysis, so follow-up questions skip the raw-response read and
+        # model validation, and a re-run replaces the stale entry.
+        status = await self.get_status(repo_id, db)
+        analysis_data = await self.get_analysis(repo_id, db, status=status)
+        
+        cache_key = self.cache._generate_key("qa_context", repo_id)
+        cached = await self.cache.get(cache_key)
+        if cached and cached['completed_at'] == status['completed_at']:
+            analysis_obj, additional_context = cached['analysis'], cached['context']
+        else:
+            analysis_obj, additional_context = await self._build_qa_context(repo_id, analysis_data, db)
+            await self.cache.set(
+                cache_key,
+                {'completed_at': status['completed_at'], 'analysis': analysis_obj,
+                 'context': additional_context},
+                ttl=3600
+            )
         
         # Use Gemini to answer with context
         answer = await self.gemini.answer_question(
@@ -636,25 +622,26 @@ class AnalysisServiceFinal:
         )
         
         # Log Q&A
-        qa_id = str(uuid.uuid4())
+        qa_id = uuid7()
         qa_log = QALog(
             id=qa_id,
             repo_id=repo_id,
             question=question,
-            answer=answer,
-            created_at=datetime.utcnow()
+            answer=answer
         )
         db.add(qa_log)
         
         try:
             await db.commit()
+            created_at = qa_log.created_at  # DB default, fetched via RETURNING
         except Exception as e:
             await db.rollback()
+            created_at = datetime.utcnow()
             print(f"Warning: Failed to log Q&A: {str(e)}")
         
         return {
             'repo_id': repo_id,
             'question': question,
             'answer': answer,
-            'created_at': qa_log.created_at
+            'created_at': created_at
         }
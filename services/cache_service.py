@@ -1,29 +1,34 @@
 """
 Caching service for reducing external API calls.
-Implements in-memory caching with TTL support.
+Implements in-memory caching with TTL support and LRU size bounding.
 """
 import asyncio
+from collections import OrderedDict
 from typing import Any, Callable, Dict, Optional
 from datetime import datetime, timedelta
 import hashlib
-import json
+
+import orjson
 
 
 class CacheService:
     """
     In-memory cache with TTL support.
+    Holds at most `maxsize` entries, evicting the least recently used.
     Can be extended to use Redis for distributed caching.
     """
     
-    def __init__(self, default_ttl: int = 3600):
+    def __init__(self, default_ttl: int = 3600, maxsize: int = 1024):
         """
         Initialize cache service.
         
         Args:
             default_ttl: Default time-to-live in seconds (default: 1 hour)
+            maxsize: Maximum number of entries (default: 1024)
         """
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.default_ttl = default_ttl
+        self.maxsize = maxsize
         self._lock = asyncio.Lock()
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
@@ -63,6 +68,7 @@ class CacheService:
                 del self._cache[key]
                 return None
             
+            self._cache.move_to_end(key)
             return entry['value']
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
@@ -75,15 +81,22 @@ class CacheService:
             ttl: Time-to-live in seconds (uses default if None)
         """
         async with self._lock:
-            expires_at = datetime.utcnow() + timedelta(
-                seconds=ttl if ttl is not None else self.default_ttl
-            )
+            now = datetime.utcnow()
+            # Drop expired entries that were never read again (bounded by maxsize)
+            for expired_key in [k for k, e in self._cache.items() if now > e['expires_at']]:
+                del self._cache[expired_key]
             
             self._cache[key] = {
                 'value': value,
-                'expires_at': expires_at,
-                'created_at': datetime.utcnow()
+                'expires_at': now + timedelta(
+                    seconds=ttl if ttl is not None else self.default_ttl
+                ),
+                'created_at': now
             }
+            self._cache.move_to_end(key)
+            
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
     
     async def delete(self, key: str):
         """Delete value from cache."""
@@ -133,12 +146,19 @@ class CacheService:
         return {
             'total_entries': len(self._cache),
             'size_bytes': sum(
-                len(json.dumps(entry['value'])) 
+                len(orjson.dumps(entry['value'], default=_stats_default))
                 for entry in self._cache.values()
             )
         }
 
 
+def _stats_default(value: Any) -> Any:
+    """Approximate non-JSON values (e.g. pydantic models) for size stats."""
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    return str(value)
+
+
 # Global cache instance
 _cache_instance: Optional[CacheService] = None
 
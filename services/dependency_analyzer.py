@@ -2,7 +2,7 @@
 Dependency analyzer - parses common manifest files without any API calls.
 Extracts frameworks, libraries, and languages to enrich LLM context.
 """
-import json
+import orjson
 import re
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Set
@@ -69,7 +69,7 @@ class DependencyAnalyzer:
 
     def _parse_package_json(self, content: str) -> Set[str]:
         try:
-            data = json.loads(content)
+            data = orjson.loads(content)
         except Exception:
             return set()
         deps = set()
@@ -2,10 +2,17 @@
 Refactored Gemini 3 service - SINGLE API CALL architecture.
 Generates all analysis in one structured response to avoid rate limits.
 """
+import asyncio
 import os
-import json
+import re
+import hashlib
+from functools import lru_cache
+from itertools import chain, islice
 from typing import Dict, List, Optional
-from pydantic import BaseModel, Field, validator
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, validator
+
+from utils.logger import get_logger
 
 # Try to import Google GenAI SDK
 try:
@@ -21,6 +28,8 @@ except ImportError:
 
 class TechStackItem(BaseModel):
     """Single technology in the stack."""
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., max_length=50, description="Technology name")
     category: str = Field(..., max_length=30, description="Category (Language/Framework/Database/Tool)")
     version: Optional[str] = Field(None, max_length=20, description="Version if detected")
@@ -28,6 +37,8 @@ class TechStackItem(BaseModel):
 
 class ComponentItem(BaseModel):
     """Single architectural component."""
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., max_length=50, description="Component name")
     purpose: str = Field(..., max_length=200, description="What this component does")
     files: List[str] = Field(default_factory=list, max_items=5, description="Key files")
@@ -35,13 +46,24 @@ class ComponentItem(BaseModel):
 
 class FileInsight(BaseModel):
     """Insight about a specific file."""
+    model_config = ConfigDict(frozen=True)
+    
     path: str = Field(..., max_length=200)
     role: str = Field(..., max_length=30, description="entry_point/config/core/utility")
     purpose: str = Field(..., max_length=150, description="One-line explanation")
 
 
+# Common AI fluff phrases, stripped from free-text fields in a single pass
+_FLUFF_RE = re.compile(
+    r"\b(?:it[’']s important to note|it should be noted|as mentioned"
+    r"|basically|essentially|in conclusion|to summarize)\b",
+    re.IGNORECASE
+)
+
+
 class RepositoryAnalysis(BaseModel):
     """Complete repository analysis - single structured response."""
+    model_config = ConfigDict(frozen=True)
     
     # Core summary (comprehensive overview)
     summary: str = Field(..., min_length=200, max_length=1500, description="10-20 sentence comprehensive project summary")
@@ -73,19 +95,163 @@ class RepositoryAnalysis(BaseModel):
     @validator('summary', 'purpose', 'data_flow')
     def no_fluff(cls, v):
         """Remove common AI fluff phrases."""
-        fluff_phrases = [
-            "it's important to note",
-            "it should be noted",
-            "as mentioned",
-            "basically",
-            "essentially",
-            "in conclusion",
-            "to summarize"
-        ]
-        result = v
-        for phrase in fluff_phrases:
-            result = result.replace(phrase, "").replace(phrase.title(), "")
-        return result.strip()
+        return _FLUFF_RE.sub("", v).strip()
+
+
+# Invariant instructions + output schema. Kept at the front of every analysis
+# prompt and built once at import: identical leading bytes let Gemini's
+# implicit prompt cache reuse them across repositories.
+ANALYSIS_PROMPT_PREFIX = """You analyze GitHub repositories and return ONLY valid JSON (no markdown, no prose).
+
+CRITICAL REQUIREMENTS:
+1. Return ONLY valid JSON matching this exact schema
+2. Use SHORT, SCANNABLE strings (no essays)
+3. Be SPECIFIC and EVIDENCE-BASED (no speculation)
+4. NO fluff phrases like "it's important to note" or "essentially"
+5. Keep arrays to specified max lengths
+6. All strings must be concise and frontend-ready
+
+Return JSON with these exact keys:
+
+{
+  "summary": "Comprehensive 10-20 sentence explanation covering: what this project does, its main features, key technologies used, target audience, primary use cases, and overall architecture approach. Be thorough and detailed.",
+  "purpose": "What problem does this solve (max 150 chars)",
+  "tech_stack": [
+    {
+      "name": "TechName",
+      "category": "Language|Framework|Database|Tool|Library",
+      "version": "1.0.0 or null"
+    }
+  ],
+  "primary_language": "Primary Language from the repository data",
+  "architecture_pattern": "MVC|Microservices|Monolith|Library|CLI|etc",
+  "components": [
+    {
+      "name": "ComponentName",
+      "purpose": "What it does (max 200 chars)",
+      "files": ["file1.py", "file2.py"]
+    }
+  ],
+  "data_flow": "How data moves through system (max 300 chars)",
+  "key_files": [
+    {
+      "path": "path/to/file",
+      "role": "entry_point|config|core|utility",
+      "purpose": "One-line explanation (max 150 chars)"
+    }
+  ],
+  "setup_steps": [
+    "Step 1: Clone repo",
+    "Step 2: Install dependencies",
+    "Step 3-6: ..."
+  ],
+  "contribution_areas": [
+    "Documentation",
+    "Tests",
+    "etc"
+  ],
+  "risky_areas": [
+    "Authentication module",
+    "Database migrations"
+  ],
+  "known_issues": [
+    "Issue pattern 1 from GitHub",
+    "Issue pattern 2"
+  ],
+  "confidence_score": 0.9
+}
+
+If README is missing or thin, use structure + dependencies + code content to infer everything. Assign confidence based on data quality, not README presence.
+
+"""
+
+
+# Fallback-answer intents: one compiled alternation per keyword list, so each
+# check is a single scan of the question (substring semantics, like `in`).
+_QUESTION_KEYWORDS = {
+    intent: re.compile("|".join(re.escape(word) for word in words))
+    for intent, words in {
+        'describe': ['what is', 'what does', 'explain', 'describe', 'about'],
+        'describe_architecture': ['architecture', 'structure'],
+        'describe_tech': ['tech', 'technology', 'stack', 'language', 'framework'],
+        'setup': ['how', 'setup', 'install', 'start', 'run', 'deploy'],
+        'tech': ['tech', 'technology', 'stack', 'built', 'language', 'framework', 'library'],
+        'architecture': ['architecture', 'structure', 'organized', 'design', 'pattern'],
+        'contribute': ['contribute', 'help', 'where', 'area'],
+        'issues': ['issue', 'problem', 'bug', 'risk', 'concern'],
+        'files': ['file', 'code', 'source', 'important'],
+        'data_flow': ['data', 'flow', 'work', 'process'],
+        'components': ['component', 'module', 'part'],
+    }.items()
+}
+
+
+
+def _extract_json_object(text: str, start: Optional[int] = None) -> Optional[str]:
+    """
+    Slice out the first balanced {...} object in text.
+    
+    Single linear scan that tracks string literals, so braces inside
+    strings don't end the object early. `start` is the index of the
+    opening brace if the caller already found it. Returns None if no
+    object closes.
+    """
+    if start is None:
+        start = text.find('{')
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+@lru_cache(maxsize=256)
+def _cached_fallback(repo_name: str, primary_lang: str) -> RepositoryAnalysis:
+    """Fallback analysis, shared per repo while Gemini keeps failing (models are frozen)."""
+    # Built from constants and repo metadata only, so skip validation
+    return RepositoryAnalysis.model_construct(
+        summary=f"{repo_name} is a {primary_lang} project currently experiencing API analysis limitations. This repository contains code, documentation, and configuration files typical of modern software development. Due to temporary API constraints, automated deep analysis is unavailable at this moment. However, basic project structure and primary technology stack have been identified. Please try again later for comprehensive analysis.",
+        purpose="Project analysis unavailable",
+        tech_stack=[
+            TechStackItem.model_construct(
+                name=primary_lang,
+                category="Programming Language",
+                version=None
+            )
+        ],
+        primary_language=primary_lang,
+        architecture_pattern="Unknown",
+        components=[],
+        data_flow="Analysis unavailable",
+        key_files=[],
+        setup_steps=[
+            "Clone repository",
+            "Review README for setup instructions"
+        ],
+        contribution_areas=["Documentation"],
+        risky_areas=[],
+        known_issues=[],
+        confidence_score=0.3
+    )
 
 
 # ============================================================================
@@ -95,11 +261,16 @@ class RepositoryAnalysis(BaseModel):
 class GeminiServiceV2:
     """Refactored Gemini service - ONE call per repository analysis."""
     
+    # Total characters of file content per prompt (~15K tokens at ~4 chars/token)
+    CODE_CONTENT_BUDGET = 60000
+    
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.client = None
         self.model_name = None
         self.using_mock = False
+        self._inflight: Dict[str, asyncio.Future] = {}  # prompt_hash -> pending analysis
+        self.logger = get_logger(__name__)
         
         gemini_model = os.getenv("GEMINI_MODEL", "flash")
         
@@ -114,63 +285,96 @@ class GeminiServiceV2:
         SINGLE API CALL to analyze entire repository.
         Returns validated, structured, frontend-ready data.
         """
-        prompt = self._build_unified_prompt(context)
+        analysis = await self.generate_analysis(self.build_prompt(context))
+        return analysis or self.fallback_analysis(context)
+    
+    async def generate_analysis(self, prompt: str) -> Optional[RepositoryAnalysis]:
+        """
+        Make the single Gemini call for a prepared prompt.
+        Returns None when Gemini is unavailable or the reply is unusable.
         
-        if self.client and self.model_name:
+        Concurrent calls with an identical prompt (e.g. a double-submitted
+        analysis) share one in-flight request instead of each calling Gemini.
+        """
+        if not (self.client and self.model_name):
+            return None
+        
+        key = self.prompt_hash(prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_analysis(prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one cancelled waiter doesn't cancel the shared call
+        return await asyncio.shield(task)
+    
+    async def _call_analysis(self, prompt: str) -> Optional[RepositoryAnalysis]:
+        """Gemini request + parsing for generate_analysis."""
+        try:
+            # JSON mode: the model returns a bare JSON object, so the
+            # extraction below is only a fallback. The SDK call is
+            # blocking, so run it off the event loop.
+            response = await asyncio.to_thread(
+                self.client.models.generate_content,
+                model=self.model_name,
+                contents=prompt,
+                config={"response_mime_type": "application/json"}
+            )
+            raw_text = response.text
+            
+            # Bare JSON (only whitespace before the first "{") is parsed as is;
+            # a markdown fence or prose in front means extracting the object
+            start = raw_text.find("{")
+            if start > 0 and not raw_text[:start].isspace():
+                raw_text = _extract_json_object(raw_text, start) or raw_text
+                start = raw_text.find("{")
+            
+            # Parse and validate in one pass (pydantic-core decodes the JSON itself)
             try:
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt
-                )
-                raw_text = response.text
-                
-                # Clean response (remove markdown fences if present)
-                if raw_text.strip().startswith("```"):
-                    raw_text = raw_text.split("```json")[-1].split("```")[0].strip()
-                elif raw_text.strip().startswith("{"):
-                    pass  # Already clean JSON
-                else:
-                    # Try to extract JSON from text
-                    import re
-                    json_match = re.search(r'\{.*\}', raw_text, re.DOTALL)
-                    if json_match:
-                        raw_text = json_match.group(0)
-                
-                # Parse and validate
-                data = json.loads(raw_text)
-                analysis = RepositoryAnalysis(**data)
-                return analysis
-                
-            except json.JSONDecodeError as e:
-                print(f"Gemini returned invalid JSON: {str(e)}")
-                return self._fallback_analysis(context)
-            except Exception as e:
-                print(f"Gemini API error: {str(e)}")
-                return self._fallback_analysis(context)
-        else:
-            return self._fallback_analysis(context)
+                return RepositoryAnalysis.model_validate_json(raw_text)
+            except ValidationError:
+                # A closing fence or sentence after the object: retry on the
+                # balanced object alone before giving up
+                extracted = _extract_json_object(raw_text, start)
+                if extracted is None or extracted == raw_text:
+                    raise
+                return RepositoryAnalysis.model_validate_json(extracted)
+            
+        except ValidationError as e:
+            self.logger.warning("Gemini returned invalid JSON", error=str(e))
+            return None
+        except Exception as e:
+            self.logger.warning("Gemini API error", error=str(e))
+            return None
     
-    def _build_unified_prompt(self, context: Dict) -> str:
+    def prompt_hash(self, prompt: str) -> str:
+        """Key identifying a Gemini response: sha256 of model name + prompt."""
+        return hashlib.sha256(f"{self.model_name or 'mock'}\n{prompt}".encode()).hexdigest()
+    
+    def build_prompt(self, context: Dict) -> str:
         """Build single comprehensive prompt for all analysis."""
         
         repo_name = context.get('repo_name', 'Unknown')
         primary_lang = context.get('primary_language', 'Unknown')
         readme = (context.get('readme') or 'No README available')[:3000]
         
-        files_list = "\n".join([
+        files_list = "\n".join(
             f"- {f['path']} ({f.get('language', 'unknown')})"
-            for f in context.get('files', [])[:20]
-        ])
+            for f in islice(context.get('files') or (), 20)
+        )
         
-        config_files = [f['path'] for f in context.get('config_files', [])[:10]]
-        entry_files = [f['path'] for f in context.get('source_files', []) if f.get('role') == 'entry_point'][:5]
+        config_files = [f['path'] for f in islice(context.get('config_files') or (), 10)]
+        # Stops scanning source files once five entry points are found
+        entry_files = list(islice(
+            (f['path'] for f in context.get('source_files') or () if f.get('role') == 'entry_point'), 5
+        ))
         
         issues_summary = f"{len(context.get('open_issues', []))} open, {len(context.get('closed_issues', []))} recently closed"
         
-        # Extract issue titles for pattern detection
+        # Extract issue titles for pattern detection (only the first five are shown)
         issue_titles = [
             issue.get('title', '')
-            for issue in (context.get('open_issues', [])[:10] + context.get('closed_issues', [])[:5])
+            for issue in islice(chain(context.get('open_issues') or (), context.get('closed_issues') or ()), 5)
         ]
 
         dependencies = context.get('dependencies', {})
@@ -183,14 +387,20 @@ class GeminiServiceV2:
         arch_conf = architecture_hints.get('confidence', 0.0)
         arch_indicators = ", ".join(architecture_hints.get('indicators', [])) if architecture_hints else "None"
 
-        # Include code snippets (limited by pre-truncation in analysis service)
+        # Include code snippets (limited by pre-truncation in analysis service).
+        # Files arrive in priority order; stop once the overall budget is spent
+        # so low-priority files don't inflate prompt size and latency.
         code_snippets = []
+        budget = self.CODE_CONTENT_BUDGET
         for path, content in context.get('file_contents', {}).items():
-            snippet = content[:10000]
+            if budget <= 0:
+                break
+            snippet = content[:min(10000, budget)]
+            budget -= len(snippet)
             code_snippets.append(f"### {path}\n{snippet}")
         code_section = "\n\n".join(code_snippets) if code_snippets else "No code content available"
         
-        prompt = f"""Analyze this GitHub repository and return ONLY valid JSON (no markdown, no prose).
+        repository_section = f"""Analyze this GitHub repository.
 
 Repository: {repo_name}
 Primary Language: {primary_lang}
@@ -217,99 +427,17 @@ Pattern: {arch_pattern} (confidence {arch_conf})
 Indicators: {arch_indicators}
 
 GitHub Issues (weight 5%): {issues_summary}
-Recent Issue Patterns: {', '.join(issue_titles[:5]) if issue_titles else 'No issues'}
-
-CRITICAL REQUIREMENTS:
-1. Return ONLY valid JSON matching this exact schema
-2. Use SHORT, SCANNABLE strings (no essays)
-3. Be SPECIFIC and EVIDENCE-BASED (no speculation)
-4. NO fluff phrases like "it's important to note" or "essentially"
-5. Keep arrays to specified max lengths
-6. All strings must be concise and frontend-ready
-
-Return JSON with these exact keys:
-
-{{
-  "summary": "Comprehensive 10-20 sentence explanation covering: what this project does, its main features, key technologies used, target audience, primary use cases, and overall architecture approach. Be thorough and detailed.",
-  "purpose": "What problem does this solve (max 150 chars)",
-  "tech_stack": [
-    {{
-      "name": "TechName",
-      "category": "Language|Framework|Database|Tool|Library",
-      "version": "1.0.0 or null"
-    }}
-  ],
-  "primary_language": "{primary_lang}",
-  "architecture_pattern": "MVC|Microservices|Monolith|Library|CLI|etc",
-  "components": [
-    {{
-      "name": "ComponentName",
-      "purpose": "What it does (max 200 chars)",
-      "files": ["file1.py", "file2.py"]
-    }}
-  ],
-  "data_flow": "How data moves through system (max 300 chars)",
-  "key_files": [
-    {{
-      "path": "path/to/file",
-      "role": "entry_point|config|core|utility",
-      "purpose": "One-line explanation (max 150 chars)"
-    }}
-  ],
-  "setup_steps": [
-    "Step 1: Clone repo",
-    "Step 2: Install dependencies",
-    "Step 3-6: ..."
-  ],
-  "contribution_areas": [
-    "Documentation",
-    "Tests",
-    "etc"
-  ],
-  "risky_areas": [
-    "Authentication module",
-    "Database migrations"
-  ],
-  "known_issues": [
-    "Issue pattern 1 from GitHub",
-    "Issue pattern 2"
-  ],
-  "confidence_score": 0.9
-}}
+Recent Issue Patterns: {', '.join(issue_titles) if issue_titles else 'No issues'}
 
-If README is missing or thin, use structure + dependencies + code content to infer everything. Assign confidence based on data quality, not README presence.
 Analyze using the weighted sources above. Use evidence only. Be concise. Return valid JSON only.
 """
-        return prompt
+        return ANALYSIS_PROMPT_PREFIX + repository_section
     
-    def _fallback_analysis(self, context: Dict) -> RepositoryAnalysis:
+    def fallback_analysis(self, context: Dict) -> RepositoryAnalysis:
         """Deterministic fallback when Gemini unavailable."""
-        primary_lang = context.get('primary_language') or 'Unknown'
-        repo_name = context.get('repo_name') or 'Unknown Repository'
-        
-        return RepositoryAnalysis(
-            summary=f"{repo_name} is a {primary_lang} project currently experiencing API analysis limitations. This repository contains code, documentation, and configuration files typical of modern software development. Due to temporary API constraints, automated deep analysis is unavailable at this moment. However, basic project structure and primary technology stack have been identified. Please try again later for comprehensive analysis.",
-            purpose="Project analysis unavailable",
-            tech_stack=[
-                TechStackItem(
-                    name=primary_lang,
-                    category="Programming Language",
-                    version=None
-                )
-            ],
-            primary_language=primary_lang,
-            architecture_pattern="Unknown",
-            components=[],
-            data_flow="Analysis unavailable",
-            key_files=[],
-            setup_steps=[
-                "Clone repository",
-                "Review README for setup instructions"
-            ],
-            contribution_areas=["Documentation"],
-            risky_areas=[],
-            known_issues=[],
-            confidence_score=0.3
+        return _cached_fallback(
+            context.get('repo_name') or 'Unknown Repository',
+            context.get('primary_language') or 'Unknown'
         )
     
     async def answer_question(self, question: str, analysis: RepositoryAnalysis, additional_context: str = "") -> str:
@@ -383,20 +511,18 @@ Answer:"""
         
         if self.client and self.model_name:
             try:
-                response = self.client.models.generate_content(
+                response = await asyncio.to_thread(
+                    self.client.models.generate_content,
                     model=self.model_name,
                     contents=prompt
                 )
                 return response.text.strip()
-            except Exception as e:
-                # Log the error for debugging
-                print(f"⚠️ Gemini API error in Q&A: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                self.logger.exception("Gemini API error in Q&A")
                 # Fallback to simple response
                 return self._generate_fallback_answer(question, analysis)
         else:
-            print("⚠️ Gemini client not available, using fallback answers")
+            self.logger.debug("Gemini client not available, using fallback answers")
             return self._generate_fallback_answer(question, analysis)
     
     def _generate_fallback_answer(self, question: str, analysis: RepositoryAnalysis) -> str:
@@ -408,37 +534,37 @@ Answer:"""
         comp_names = [c.name for c in analysis.components[:4]]
         
         # More specific keyword matching with varied responses
-        if any(word in question_lower for word in ['what is', 'what does', 'explain', 'describe', 'about']):
-            if 'architecture' in question_lower or 'structure' in question_lower:
+        if _QUESTION_KEYWORDS['describe'].search(question_lower):
+            if _QUESTION_KEYWORDS['describe_architecture'].search(question_lower):
                 comp_list = ', '.join(comp_names) if comp_names else "various modules"
                 return f"This project follows a {analysis.architecture_pattern} architecture with components including {comp_list}. {analysis.data_flow}"
-            elif any(tech in question_lower for tech in ['tech', 'technology', 'stack', 'language', 'framework']):
+            elif _QUESTION_KEYWORDS['describe_tech'].search(question_lower):
                 tech_list = ', '.join(tech_names) if tech_names else "various technologies"
                 return f"The project is built with {tech_list}. The primary language is {analysis.primary_language}."
             else:
                 return f"{analysis.summary} {analysis.purpose}"
         
-        elif any(word in question_lower for word in ['how', 'setup', 'install', 'start', 'run', 'deploy']):
+        elif _QUESTION_KEYWORDS['setup'].search(question_lower):
             if analysis.setup_steps:
                 steps = '. '.join(analysis.setup_steps[:3])
                 return f"To get started: {steps}. Check the repository for complete setup instructions."
             return "Setup instructions: Clone the repository and follow the README for detailed setup steps."
         
-        elif any(word in question_lower for word in ['tech', 'technology', 'stack', 'built', 'language', 'framework', 'library']):
+        elif _QUESTION_KEYWORDS['tech'].search(question_lower):
             tech_list = ', '.join(tech_names) if tech_names else "various technologies"
             return f"This project uses {tech_list}. The architecture follows a {analysis.architecture_pattern} pattern."
         
-        elif any(word in question_lower for word in ['architecture', 'structure', 'organized', 'design', 'pattern']):
+        elif _QUESTION_KEYWORDS['architecture'].search(question_lower):
             comp_list = ', '.join(comp_names) if comp_names else "multiple components"
             return f"Architecture: {analysis.architecture_pattern}. Main components: {comp_list}. {analysis.data_flow}"
         
-        elif any(word in question_lower for word in ['contribute', 'help', 'where', 'area']):
+        elif _QUESTION_KEYWORDS['contribute'].search(question_lower):
             if analysis.contribution_areas:
                 areas = ', '.join(analysis.contribution_areas[:3])
                 return f"You can contribute in these areas: {areas}."
             return "Check the repository issues and README for contribution guidelines."
         
-        elif any(word in question_lower for word in ['issue', 'problem', 'bug', 'risk', 'concern']):
+        elif _QUESTION_KEYWORDS['issues'].search(question_lower):
             issues = analysis.known_issues[:3] if analysis.known_issues else []
             risks = analysis.risky_areas[:2] if analysis.risky_areas else []
             
@@ -451,16 +577,16 @@ Answer:"""
                 return ". ".join(result) + "."
             return "No specific issues or risks identified in the analysis."
         
-        elif any(word in question_lower for word in ['file', 'code', 'source', 'important']):
+        elif _QUESTION_KEYWORDS['files'].search(question_lower):
             if analysis.key_files:
                 files = ', '.join([f.path for f in analysis.key_files[:3]])
                 return f"Key files in this project include: {files}. These files are central to the project's functionality."
             return "File structure information is available in the repository."
         
-        elif any(word in question_lower for word in ['data', 'flow', 'work', 'process']):
+        elif _QUESTION_KEYWORDS['data_flow'].search(question_lower):
             return f"Data flow: {analysis.data_flow}. The system follows a {analysis.architecture_pattern} pattern."
         
-        elif any(word in question_lower for word in ['component', 'module', 'part']):
+        elif _QUESTION_KEYWORDS['components'].search(question_lower):
             if comp_names:
                 return f"Main components: {', '.join(comp_names)}. Each component serves a specific purpose in the {analysis.architecture_pattern} architecture."
             return f"The project is organized following a {analysis.architecture_pattern} architecture pattern."
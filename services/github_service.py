@@ -2,19 +2,48 @@
 GitHub service for fetching repository data.
 Handles API interaction, rate limiting, and error handling.
 """
+import asyncio
+import base64
 import httpx
 import os
+import random
 import re
+import time
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime
-from services.cache_service import get_cache
+from services.cache_service import CacheService, get_cache
+from utils.file_filter import FileFilter
 from utils.logger import get_logger
 
+# Trailing slash and ".git" suffix are handled here rather than by rewriting the URL
+_REPO_URL_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/([^/]+)/([^/]+?)(?:\.git)?(?:/|$)')
+
+# Open and closed issues in one request; GraphQL's issues connection excludes PRs
+_ISSUES_QUERY = """
+query($owner: String!, $name: String!, $open: Int!, $closed: Int!) {
+  repository(owner: $owner, name: $name) {
+    open: issues(states: OPEN, first: $open, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { number title updatedAt }
+    }
+    closed: issues(states: CLOSED, first: $closed, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { number title updatedAt }
+    }
+  }
+}
+"""
 
 class GitHubService:
     """Service for interacting with GitHub REST API."""
     
     BASE_URL = "https://api.github.com"
+    MAX_CONCURRENT_REQUESTS = 10
+    ETAG_TTL = 86400  # keep validators for a day; 304s don't count against rate limits
+    ETAG_CACHE_SIZE = 1024  # bodies kept for revalidation (files, trees, READMEs)
+    MAX_RATE_LIMIT_RETRIES = 2
+    RATE_LIMIT_MAX_WAIT = 30.0  # total seconds one request may spend backing off
+    TREE_WALK_MAX_DEPTH = 3  # directory levels walked when the git tree is truncated
+    README_MAX_BYTES = 12000  # covers the prompt's 3000-char README slice even for multi-byte text
+    FILE_MAX_BYTES = 65536  # callers keep at most 10000 chars of a file
     
     def __init__(self):
         self.token = os.getenv("GITHUB_TOKEN")
@@ -25,7 +54,30 @@ class GitHubService:
             self.headers["Authorization"] = f"token {self.token}"
         
         self.cache = get_cache()
+        # ETag validators + last bodies, in their own bounded store so file
+        # bodies can't crowd out (or outlive) the shared cache's entries
+        self._etags = CacheService(default_ttl=self.ETAG_TTL, maxsize=self.ETAG_CACHE_SIZE)
         self.logger = get_logger(__name__)
+        # Bounds concurrent file fetches when callers gather them
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, so GitHub calls reuse pooled keep-alive connections."""
+        if self._client is None:
+            # SSL verification disabled for potential corporate proxies
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                verify=False,
+                limits=httpx.Limits(max_connections=50, keepalive_expiry=60)
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the shared HTTP client (called on app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def parse_repo_url(self, repo_url: str) -> Tuple[str, str]:
         """
@@ -35,12 +87,7 @@ class GitHubService:
         - https://github.com/owner/repo.git
         - github.com/owner/repo
         """
-        # Remove trailing slashes and .git
-        repo_url = repo_url.rstrip('/').replace('.git', '')
-        
-        # Extract owner and repo using regex
-        pattern = r'(?:https?://)?(?:www\.)?github\.com/([^/]+)/([^/]+)'
-        match = re.search(pattern, repo_url)
+        match = _REPO_URL_RE.search(repo_url)
         
         if not match:
             raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
@@ -50,6 +97,71 @@ class GitHubService:
         
         return owner, repo
     
+    async def _conditional_get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        as_json: bool = True
+    ):
+        """
+        GET with If-None-Match revalidation.
+        
+        The last body seen for a URL is cached with its ETag; a 304 reply
+        reuses it. Rate-limited replies are retried with bounded backoff
+        (see _rate_limit_delay). Raises httpx.HTTPStatusError like
+        raise_for_status().
+        """
+        cache_key = self._etags._generate_key("github:etag", url, params)
+        cached = await self._etags.get(cache_key)
+        
+        request_headers = dict(self.headers if headers is None else headers)
+        if cached:
+            request_headers["If-None-Match"] = cached["etag"]
+        
+        waited = 0.0
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            response = await self._get_client().get(url, headers=request_headers, params=params)
+            delay = self._rate_limit_delay(response, attempt)
+            if (delay is None or attempt == self.MAX_RATE_LIMIT_RETRIES
+                    or waited + delay > self.RATE_LIMIT_MAX_WAIT):
+                break
+            self.logger.warning("GitHub rate limited, retrying", url=url, delay=round(delay, 2))
+            await asyncio.sleep(delay)
+            waited += delay
+        
+        if cached and response.status_code == 304:
+            return cached["body"]
+        response.raise_for_status()
+        
+        body = response.json() if as_json else response.text
+        etag = response.headers.get("ETag")
+        if etag:
+            await self._etags.set(cache_key, {"etag": etag, "body": body})
+        return body
+    
+    @staticmethod
+    def _rate_limit_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a throttled response, or None if it
+        isn't one. Honors Retry-After and X-RateLimit-Reset; a 429 without
+        either backs off exponentially with jitter. Other 403s aren't retried.
+        """
+        if response.status_code not in (403, 429):
+            return None
+        
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset and reset.isdigit():
+            return max(0.0, int(reset) - time.time())
+        
+        if response.status_code == 429:
+            return 2 ** attempt + random.random()
+        return None
+    
     async def get_repo_metadata(self, owner: str, repo: str) -> Dict:
         """Fetch repository metadata from GitHub API with caching."""
         cache_key = self.cache._generate_key("github:metadata", owner, repo)
@@ -57,81 +169,97 @@ class GitHubService:
         async def fetch():
             url = f"{self.BASE_URL}/repos/{owner}/{repo}"
             
-            # Create client with SSL verification disabled for potential corporate proxies
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-                try:
-                    self.logger.info("Fetching repo metadata", owner=owner, repo=repo)
-                    response = await client.get(url, headers=self.headers)
-                    response.raise_for_status()
-                    return response.json()
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 404:
-                        raise ValueError(f"Repository not found: {owner}/{repo}")
-                    elif e.response.status_code == 403:
-                        raise ValueError("GitHub API rate limit exceeded. Please add GITHUB_TOKEN to .env")
-                    else:
-                        raise ValueError(f"GitHub API error: {e.response.status_code}")
-                except httpx.ConnectError as e:
-                    raise ValueError(f"Failed to connect to GitHub: Connection error. Check your internet connection.")
-                except httpx.TimeoutException as e:
-                    raise ValueError(f"Failed to connect to GitHub: Request timed out. Check your internet connection.")
-                except httpx.RequestError as e:
-                    raise ValueError(f"Failed to connect to GitHub: {str(e)}")
+            try:
+                self.logger.info("Fetching repo metadata", owner=owner, repo=repo)
+                # Revalidated with ETag once the hour-long cache entry expires
+                return await self._conditional_get(url)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    raise ValueError(f"Repository not found: {owner}/{repo}")
+                elif e.response.status_code == 403:
+                    raise ValueError("GitHub API rate limit exceeded. Please add GITHUB_TOKEN to .env")
+                else:
+                    raise ValueError(f"GitHub API error: {e.response.status_code}")
+            except httpx.ConnectError as e:
+                raise ValueError(f"Failed to connect to GitHub: Connection error. Check your internet connection.")
+            except httpx.TimeoutException as e:
+                raise ValueError(f"Failed to connect to GitHub: Request timed out. Check your internet connection.")
+            except httpx.RequestError as e:
+                raise ValueError(f"Failed to connect to GitHub: {str(e)}")
         
         return await self.cache.get_or_fetch(cache_key, fetch, ttl=3600)
     
-    async def get_readme(self, owner: str, repo: str) -> Optional[str]:
-        """Fetch README content."""
-        url = f"{self.BASE_URL}/repos/{owner}/{repo}/readme"
+    async def _get_json(self, url: str, params: Optional[Dict] = None, default=None):
+        """Conditional JSON GET that returns default on HTTP or connection errors."""
+        try:
+            return await self._conditional_get(url, params=params)
+        except (httpx.HTTPStatusError, httpx.RequestError):
+            return default
+    
+    async def _get_raw(self, download_url: str) -> Optional[str]:
+        """Fetch raw file text from a contents download_url (no API headers)."""
+        try:
+            return await self._conditional_get(download_url, headers={}, as_json=False)
+        except (httpx.HTTPStatusError, httpx.RequestError):
+            return None
+    
+    async def get_readme(self, owner: str, repo: str, max_bytes: int = README_MAX_BYTES) -> Optional[str]:
+        """
+        Fetch README content, truncated to about max_bytes.
         
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-            try:
-                response = await client.get(url, headers=self.headers)
+        The readme endpoint already returns the file base64-encoded, so only
+        the needed prefix is decoded; download_url is a fallback.
+        """
+        data = await self._get_json(f"{self.BASE_URL}/repos/{owner}/{repo}/readme")
+        if not data:
+            return None
+        
+        if data.get('encoding') == 'base64' and data.get('content'):
+            # GitHub wraps the base64 at 60 columns; 4 chars decode to 3 bytes
+            encoded = data['content'].replace('\n', '')[:-(-max_bytes // 3) * 4]
+            return base64.b64decode(encoded).decode('utf-8', errors='ignore')
+        
+        # Fetch raw content
+        if 'download_url' in data:
+            return await self._get_raw(data['download_url'])
+        return None
+    
+    async def _get_raw_prefix(self, download_url: str, max_bytes: int) -> Optional[str]:
+        """Stream raw file text, stopping after max_bytes instead of reading it all."""
+        try:
+            async with self._get_client().stream("GET", download_url) as response:
                 response.raise_for_status()
-                data = response.json()
-                
-                # Fetch raw content
-                if 'download_url' in data:
-                    content_response = await client.get(data['download_url'])
-                    content_response.raise_for_status()
-                    return content_response.text
-                return None
-            except (httpx.HTTPStatusError, httpx.RequestError):
-                return None
-    
-    async def get_file_content(self, owner: str, repo: str, path: str) -> Optional[str]:
-        """Fetch content of a specific file."""
+                buf = bytearray()
+                async for chunk in response.aiter_bytes():
+                    buf += chunk
+                    if len(buf) >= max_bytes:
+                        break
+            return bytes(buf[:max_bytes]).decode('utf-8', errors='ignore')
+        except (httpx.HTTPStatusError, httpx.RequestError):
+            return None
+    
+    async def get_file_content(
+        self, owner: str, repo: str, path: str, max_bytes: int = FILE_MAX_BYTES
+    ) -> Optional[str]:
+        """
+        Fetch content of a specific file. Files larger than max_bytes
+        (per the contents API size) are truncated while streaming.
+        """
         url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}"
         
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                
-                if isinstance(data, dict) and 'download_url' in data:
-                    content_response = await client.get(data['download_url'])
-                    content_response.raise_for_status()
-                    return content_response.text
-                return None
-            except (httpx.HTTPStatusError, httpx.RequestError):
-                return None
+        async with self._semaphore:
+            data = await self._get_json(url)
+            
+            if isinstance(data, dict) and 'download_url' in data:
+                if (data.get('size') or 0) > max_bytes:
+                    return await self._get_raw_prefix(data['download_url'], max_bytes)
+                return await self._get_raw(data['download_url'])
+            return None
     
     async def list_files(self, owner: str, repo: str, path: str = "") -> List[Dict]:
         """List files in a directory."""
-        url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}"
-        
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                
-                if isinstance(data, list):
-                    return data
-                return []
-            except (httpx.HTTPStatusError, httpx.RequestError):
-                return []
+        data = await self._get_json(f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{path}")
+        return data if isinstance(data, list) else []
     
     async def get_issues(self, owner: str, repo: str, state: str = "open", max_issues: int = 50) -> List[Dict]:
         """Fetch repository issues."""
@@ -143,34 +271,99 @@ class GitHubService:
             "direction": "desc"
         }
         
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+        issues = await self._get_json(url, params=params, default=[])
+        # Filter out pull requests (they appear in issues endpoint)
+        return [issue for issue in issues if 'pull_request' not in issue]
+    
+    async def get_issue_lists(
+        self, owner: str, repo: str, max_open: int = 30, max_closed: int = 20
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Recently updated open and closed issues, pull requests excluded.
+        
+        With a token this is one GraphQL query that filters PRs server-side
+        and returns only the fields used; GraphQL requires auth, so the REST
+        issues endpoint is the fallback.
+        """
+        if self.token:
             try:
-                response = await client.get(url, headers=self.headers, params=params)
+                response = await self._get_client().post(
+                    f"{self.BASE_URL}/graphql",
+                    headers=self.headers,
+                    json={
+                        "query": _ISSUES_QUERY,
+                        "variables": {"owner": owner, "name": repo,
+                                      "open": min(max_open, 100), "closed": min(max_closed, 100)}
+                    }
+                )
                 response.raise_for_status()
-                issues = response.json()
-                
-                # Filter out pull requests (they appear in issues endpoint)
-                return [issue for issue in issues if 'pull_request' not in issue]
-            except (httpx.HTTPStatusError, httpx.RequestError):
-                return []
+                repository = (response.json().get('data') or {}).get('repository')
+                if repository:
+                    return repository['open']['nodes'], repository['closed']['nodes']
+            except (httpx.HTTPStatusError, httpx.RequestError,
+                    ValueError, KeyError, TypeError, AttributeError) as e:
+                # Non-JSON bodies and unexpected shapes fall back to REST too
+                self.logger.warning("GraphQL issue query failed, using REST", error=str(e))
+        
+        open_issues, closed_issues = await asyncio.gather(
+            self.get_issues(owner, repo, state="open", max_issues=max_open),
+            self.get_issues(owner, repo, state="closed", max_issues=max_closed)
+        )
+        return open_issues, closed_issues
     
-    async def get_repository_tree(self, owner: str, repo: str, branch: str = "main") -> List[Dict]:
+    async def get_repository_tree(
+        self, owner: str, repo: str, default_branch: Optional[str] = None
+    ) -> List[Dict]:
         """
         Get repository file tree.
-        Try main/master branches.
+        
+        With the default branch known (from repo metadata) this is a single
+        request; otherwise main/master are tried concurrently, in that order
+        of preference. A truncated tree is replaced by a shallow walk of the
+        contents API.
         """
-        for branch_name in [branch, "main", "master"]:
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/git/trees/{branch_name}?recursive=1"
-            
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-                try:
-                    response = await client.get(url, headers=self.headers)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'tree' in data:
-                        return data['tree']
-                except (httpx.HTTPStatusError, httpx.RequestError):
-                    continue
-        
-        return []
\ No newline at end of file
+        branches = [default_branch] if default_branch else ["main", "master"]
+        results = await asyncio.gather(*(
+            self._fetch_tree(owner, repo, branch_name) for branch_name in branches
+        ))
+        
+        for data in results:
+            if data is None:
+                continue
+            if data.get('truncated'):
+                self.logger.warning("Git tree truncated, walking contents API", owner=owner, repo=repo)
+                return await self._walk_contents(owner, repo) or data['tree']
+            return data['tree']
+        return []
+    
+    async def _fetch_tree(self, owner: str, repo: str, branch: str) -> Optional[Dict]:
+        """Fetch the recursive tree response for one branch, or None if it doesn't exist."""
+        data = await self._get_json(f"{self.BASE_URL}/repos/{owner}/{repo}/git/trees/{branch}?recursive=1")
+        return data if data and 'tree' in data else None
+    
+    async def _walk_contents(self, owner: str, repo: str, path: str = "", depth: int = 0) -> List[Dict]:
+        """
+        Tree-shaped entries from the contents API, subdirectories fetched
+        concurrently. Ignored directories are skipped and the walk stops at
+        TREE_WALK_MAX_DEPTH, since file selection favors shallow paths.
+        """
+        async with self._semaphore:
+            items = await self.list_files(owner, repo, path)
+        
+        tree = []
+        subdirs = []
+        for item in items:
+            if item.get('type') == 'dir':
+                tree.append({'path': item['path'], 'type': 'tree'})
+                name = item.get('name', '')
+                if (depth + 1 < self.TREE_WALK_MAX_DEPTH
+                        and name not in FileFilter.IGNORE_DIRS and not name.startswith('.')):
+                    subdirs.append(item['path'])
+            elif item.get('type') == 'file':
+                tree.append({'path': item['path'], 'type': 'blob', 'size': item.get('size')})
+        
+        for subtree in await asyncio.gather(*(
+            self._walk_contents(owner, repo, subdir, depth + 1) for subdir in subdirs
+        )):
+            tree.extend(subtree)
+        return tree
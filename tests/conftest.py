@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from httpx import AsyncClient
 
 from main import app
-from db.database import Base
+from db.database import Base, close_db
 
 
 # Test database URL
@@ -23,6 +23,13 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+async def dispose_app_engine():
+    """Close the app engine's pooled connections so the test run can exit."""
+    yield
+    await close_db()
+
+
 @pytest.fixture(scope="function")
 async def test_db() -> AsyncGenerator[AsyncSession, None]:
     """Create test database session."""
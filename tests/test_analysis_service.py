@@ -0,0 +1,350 @@
+"""
+Tests for the analysis service.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.database import Base, create_engine_for_url
+from models.schemas import (
+    Repository, AnalysisSession, AnalysisSummary, ArchitectureComponent,
+    KnownIssue, RawAnalysisResponse, SetupStep, TechStack
+)
+from services.analysis_service import AnalysisServiceFinal
+from services.cache_service import CacheService
+from services.gemini_service import RepositoryAnalysis
+
+
+@pytest.fixture
+async def db_session_maker(tmp_path):
+    """Session factory on a temp file DB with the app's PRAGMAs (FKs on)."""
+    test_engine = create_engine_for_url(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    await test_engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestExecuteAnalysisFailure:
+    """Test that failed analyses are recorded as failed."""
+
+    async def test_failed_flush_marks_session_failed(self, db_session_maker, mocker):
+        """A DB error mid-analysis must not leave the session 'processing'."""
+        repo_id = str(uuid.uuid4())
+        session_id = str(uuid.uuid4())
+
+        async with db_session_maker() as db:
+            db.add(Repository(id=repo_id, repo_url="https://github.com/owner/repo",
+                              owner="owner", name="repo"))
+            await db.flush()
+            db.add(AnalysisSession(id=session_id, repo_id=repo_id,
+                                   status="processing", started_at=datetime.utcnow()))
+            await db.commit()
+
+        service = AnalysisServiceFinal()
+
+        async with db_session_maker() as db:
+            async def poison_session(owner, repo):
+                # Orphan row -> IntegrityError on flush, leaving the session
+                # in a state that requires rollback.
+                db.add(TechStack(id=str(uuid.uuid4()), repo_id="missing-repo",
+                                 name="Python", category="Language"))
+                await db.flush()
+
+            mocker.patch.object(service.github, "get_repo_metadata", side_effect=poison_session)
+            await service.execute_analysis(repo_id, db)
+
+        async with db_session_maker() as db:
+            result = await db.execute(
+                select(AnalysisSession).where(AnalysisSession.id == session_id)
+            )
+            session = result.scalar_one()
+
+        assert session.status == "failed"
+        assert session.completed_at is not None
+        assert "FOREIGN KEY" in session.error_message
+
+
+@pytest.mark.asyncio
+class TestStartAnalysis:
+    """Test analysis session creation."""
+
+    async def test_same_url_reuses_repository(self, db_session_maker):
+        """Re-analyzing a URL reuses its repository row and adds a new session."""
+        service = AnalysisServiceFinal()
+        repo_url = "https://github.com/owner/repo"
+
+        async with db_session_maker() as db:
+            first = await service.start_analysis(repo_url, db)
+        async with db_session_maker() as db:
+            second = await service.start_analysis(repo_url, db)
+
+        assert first["repo_id"] == second["repo_id"]
+        assert first["session_id"] != second["session_id"]
+
+        async with db_session_maker() as db:
+            repos = (await db.execute(select(Repository))).scalars().all()
+            sessions = (await db.execute(select(AnalysisSession))).scalars().all()
+
+        assert len(repos) == 1
+        assert repos[0].owner == "owner" and repos[0].name == "repo"
+        assert len(sessions) == 2
+
+
+@pytest.mark.asyncio
+class TestDatabaseTimestamps:
+    """Test timestamps generated by the database."""
+
+    async def test_session_and_qa_timestamps(self, db_session_maker):
+        """started_at and Q&A created_at are filled in by SQLite."""
+        service = AnalysisServiceFinal()
+
+        async with db_session_maker() as db:
+            started = await service.start_analysis("https://github.com/owner/repo", db)
+        repo_id = started["repo_id"]
+
+        async with db_session_maker() as db:
+            status = await service.get_status(repo_id, db)
+        assert status["status"] == "processing"
+        assert status["started_at"] is not None
+
+        async with db_session_maker() as db:
+            await db.execute(
+                update(AnalysisSession)
+                .where(AnalysisSession.id == started["session_id"])
+                .values(status="completed", completed_at=datetime.utcnow())
+            )
+            db.add(AnalysisSummary(repo_id=repo_id, summary="S" * 250, purpose="Testing",
+                                   architecture_pattern="MVC", data_flow="A -> B"))
+            db.add(TechStack(id=str(uuid.uuid4()), repo_id=repo_id,
+                             name="Python", category="Language"))
+            for i, step in enumerate(["Clone", "Install"]):
+                db.add(SetupStep(id=str(uuid.uuid4()), repo_id=repo_id,
+                                 step_order=i + 1, instruction=step))
+            await db.commit()
+
+        async with db_session_maker() as db:
+            result = await service.answer_question(repo_id, "What is the tech stack?", db)
+
+        assert isinstance(result["created_at"], datetime)
+
+
+@pytest.mark.asyncio
+class TestLoadAnalysis:
+    """Test reading a stored analysis from the split tables."""
+
+    async def test_loads_all_child_tables(self, db_session_maker):
+        """Summary and every child collection are returned, steps in order."""
+        service = AnalysisServiceFinal()
+        repo_id = str(uuid.uuid4())
+
+        async with db_session_maker() as db:
+            db.add(Repository(id=repo_id, repo_url="https://github.com/owner/repo",
+                              owner="owner", name="repo"))
+            await db.flush()
+            db.add(AnalysisSummary(repo_id=repo_id, summary="Summary", purpose="Testing",
+                                   architecture_pattern="MVC", data_flow="A -> B"))
+            db.add(TechStack(id=str(uuid.uuid4()), repo_id=repo_id,
+                             name="Python", category="Language"))
+            db.add(ArchitectureComponent(id=str(uuid.uuid4()), repo_id=repo_id, name="API",
+                                         purpose="Routes", key_files=["main.py"]))
+            for i, step in reversed(list(enumerate(["Clone", "Install", "Run"]))):
+                db.add(SetupStep(id=str(uuid.uuid4()), repo_id=repo_id,
+                                 step_order=i + 1, instruction=step))
+            db.add(KnownIssue(id=str(uuid.uuid4()), repo_id=repo_id, issue="Flaky CI"))
+            await db.commit()
+
+        async with db_session_maker() as db:
+            data = await service._load_analysis(repo_id, db)
+
+        assert data["summary"] == "Summary"
+        assert data["tech_stack"] == [{"name": "Python", "category": "Language", "version": None}]
+        assert data["components"] == [{"name": "API", "purpose": "Routes", "files": ["main.py"]}]
+        assert data["setup_steps"] == ["Clone", "Install", "Run"]
+        assert data["known_issues"] == ["Flaky CI"]
+        assert data["key_files"] == [] and data["risky_areas"] == []
+
+    async def test_missing_summary_raises(self, db_session_maker):
+        """A repository without a stored summary is reported as not found."""
+        service = AnalysisServiceFinal()
+
+        async with db_session_maker() as db:
+            with pytest.raises(ValueError, match="Analysis data not found"):
+                await service._load_analysis("missing-repo", db)
+
+
+@pytest.mark.asyncio
+class TestGetAnalysisCache:
+    """Test the per-repo analysis cache."""
+
+    async def test_rerun_replaces_cached_entry(self, db_session_maker, mocker):
+        """A new completed_at reloads and overwrites the repo's single entry."""
+        service = AnalysisServiceFinal()
+        service.cache = CacheService()
+        load = mocker.spy(service, "_load_analysis")
+
+        async with db_session_maker() as db:
+            started = await service.start_analysis("https://github.com/owner/repo", db)
+        repo_id = started["repo_id"]
+
+        async with db_session_maker() as db:
+            db.add(AnalysisSummary(repo_id=repo_id, summary="S" * 250, purpose="Testing",
+                                   architecture_pattern="MVC", data_flow="A -> B"))
+            await db.commit()
+
+        for completed_at in ["2024-01-01T00:00:00", "2024-01-01T00:00:00", "2024-01-02T00:00:00"]:
+            status = {"status": "completed", "completed_at": completed_at}
+            async with db_session_maker() as db:
+                await service.get_analysis(repo_id, db, status=status)
+
+        assert load.call_count == 2
+        assert service.cache.get_stats()["total_entries"] == 1
+
+
+@pytest.mark.asyncio
+class TestStoredResponseReuse:
+    """Test reuse of stored Gemini responses for unchanged inputs."""
+
+    async def test_unchanged_inputs_skip_gemini(self, db_session_maker, mocker, mock_github_response,
+                                                 mock_gemini_analysis):
+        """A second analysis with the same prompt reuses raw_json instead of calling Gemini."""
+        service = AnalysisServiceFinal()
+        service.gemini.model_name = "test-model"
+        mocker.patch.object(service.github, "get_repo_metadata",
+                            mocker.AsyncMock(return_value=mock_github_response))
+        mocker.patch.object(service.github, "get_readme", mocker.AsyncMock(return_value="# Test"))
+        mocker.patch.object(service.github, "get_repository_tree", mocker.AsyncMock(return_value=[]))
+        mocker.patch.object(service.github, "get_issues", mocker.AsyncMock(return_value=[]))
+        generate = mocker.patch.object(service.gemini, "generate_analysis", mocker.AsyncMock(
+            return_value=RepositoryAnalysis(**{**mock_gemini_analysis, "summary": "S" * 250})
+        ))
+
+        async with db_session_maker() as db:
+            repo_id = (await service.start_analysis("https://github.com/owner/repo", db))["repo_id"]
+        async with db_session_maker() as db:
+            await service.execute_analysis(repo_id, db)
+        async with db_session_maker() as db:
+            await service.start_analysis("https://github.com/owner/repo", db)
+        async with db_session_maker() as db:
+            await service.execute_analysis(repo_id, db)
+            status = await service.get_status(repo_id, db)
+            data = await service._load_analysis(repo_id, db)
+
+        assert generate.call_count == 1
+        assert status["status"] == "completed"
+        # Child rows are replaced, not duplicated, on re-analysis
+        assert [t["name"] for t in data["tech_stack"]] == ["Python"]
+        assert data["components"] == [{"name": "API", "purpose": "REST API", "files": ["main.py"]}]
+        assert data["setup_steps"] == ["pip install -r requirements.txt", "python main.py"]
+
+    async def test_fallback_is_not_reused(self, db_session_maker, mocker, mock_github_response):
+        """A fallback analysis stores no prompt_hash, so the next run retries Gemini."""
+        service = AnalysisServiceFinal()
+        mocker.patch.object(service.github, "get_repo_metadata",
+                            mocker.AsyncMock(return_value=mock_github_response))
+        mocker.patch.object(service.github, "get_readme", mocker.AsyncMock(return_value=None))
+        mocker.patch.object(service.github, "get_repository_tree", mocker.AsyncMock(return_value=[]))
+        mocker.patch.object(service.github, "get_issues", mocker.AsyncMock(return_value=[]))
+        generate = mocker.patch.object(service.gemini, "generate_analysis",
+                                       mocker.AsyncMock(return_value=None))
+
+        async with db_session_maker() as db:
+            repo_id = (await service.start_analysis("https://github.com/owner/repo", db))["repo_id"]
+        for _ in range(2):
+            async with db_session_maker() as db:
+                await service.execute_analysis(repo_id, db)
+
+        async with db_session_maker() as db:
+            raw = (await db.execute(select(RawAnalysisResponse))).scalar_one()
+
+        assert generate.call_count == 2
+        assert raw.prompt_hash is None
+
+
+@pytest.mark.asyncio
+class TestAnalysisTransaction:
+    """Test transaction scoping in execute_analysis."""
+
+    async def test_no_lock_held_during_gemini_call(self, db_session_maker, mocker, mock_github_response,
+                                                    mock_gemini_analysis):
+        """Other writers can commit while the analysis waits on Gemini."""
+        service = AnalysisServiceFinal()
+        mocker.patch.object(service.github, "get_repo_metadata",
+                            mocker.AsyncMock(return_value=mock_github_response))
+        mocker.patch.object(service.github, "get_readme", mocker.AsyncMock(return_value=None))
+        mocker.patch.object(service.github, "get_repository_tree", mocker.AsyncMock(return_value=[]))
+        mocker.patch.object(service.github, "get_issues", mocker.AsyncMock(return_value=[]))
+
+        async with db_session_maker() as db:
+            repo_id = (await service.start_analysis("https://github.com/owner/repo", db))["repo_id"]
+
+        async def concurrent_write(prompt):
+            async with db_session_maker() as other_db:
+                await service.start_analysis("https://github.com/owner/other", other_db)
+            return RepositoryAnalysis(**{**mock_gemini_analysis, "summary": "S" * 250})
+
+        mocker.patch.object(service.gemini, "generate_analysis", side_effect=concurrent_write)
+
+        async with db_session_maker() as db:
+            await service.execute_analysis(repo_id, db)
+            status = await service.get_status(repo_id, db)
+            session = (await db.execute(
+                select(AnalysisSession).where(AnalysisSession.repo_id == repo_id)
+            )).scalar_one()
+
+        assert status["status"] == "completed"
+        assert session.gemini_call_count == 1
+
+
+@pytest.mark.asyncio
+class TestAnswerQuestion:
+    """Test Q&A context reuse."""
+
+    async def test_context_built_once_per_analysis(self, db_session_maker, mocker):
+        """Follow-up questions reuse the assembled context until the analysis changes."""
+        service = AnalysisServiceFinal()
+        service.cache = CacheService()
+        build = mocker.spy(service, "_build_qa_context")
+
+        async with db_session_maker() as db:
+            started = await service.start_analysis("https://github.com/owner/repo", db)
+        repo_id = started["repo_id"]
+
+        async with db_session_maker() as db:
+            await db.execute(
+                update(AnalysisSession)
+                .where(AnalysisSession.id == started["session_id"])
+                .values(status="completed", completed_at=datetime(2024, 1, 1))
+            )
+            db.add(AnalysisSummary(repo_id=repo_id, summary="S" * 250, purpose="Testing",
+                                   architecture_pattern="MVC", data_flow="A -> B"))
+            db.add(TechStack(id=str(uuid.uuid4()), repo_id=repo_id,
+                             name="Python", category="Language"))
+            for i, step in enumerate(["Clone", "Install"]):
+                db.add(SetupStep(id=str(uuid.uuid4()), repo_id=repo_id,
+                                 step_order=i + 1, instruction=step))
+            await db.commit()
+
+        for question in ["What is the tech stack?", "How do I install it?"]:
+            async with db_session_maker() as db:
+                await service.answer_question(repo_id, question, db)
+        assert build.call_count == 1
+
+        # A re-run analysis (new completed_at) rebuilds the context
+        async with db_session_maker() as db:
+            await db.execute(
+                update(AnalysisSession)
+                .where(AnalysisSession.id == started["session_id"])
+                .values(completed_at=datetime(2024, 1, 2))
+            )
+            await db.commit()
+        async with db_session_maker() as db:
+            await service.answer_question(repo_id, "What is the tech stack?", db)
+        assert build.call_count == 2
+        # One analysis + one context entry for the repo; stats still encode them
+        stats = service.cache.get_stats()
+        assert stats["total_entries"] == 2 and stats["size_bytes"] > 0
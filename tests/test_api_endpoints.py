@@ -56,5 +56,94 @@ class TestAPIEndpoints:
             json={"repo_url": "https://github.com/owner/repo"}
         )
         
-        # Should return 200 with repo_id and processing status
-        assert response.status_code in [200, 500]  # May fail without full setup
+        # Should return 202 with repo_id and processing status
+        assert response.status_code in [202, 500]  # May fail without full setup
+    
+    async def test_get_analysis_etag(self, client: AsyncClient, mocker):
+        """Completed analyses carry an ETag; a matching If-None-Match gets 304."""
+        from routes.api import analysis_service
+        
+        mocker.patch.object(analysis_service, "get_status", mocker.AsyncMock(return_value={
+            "repo_id": "etag-repo",
+            "status": "completed",
+            "completed_at": "2024-01-01T00:00:00"
+        }))
+        load = mocker.patch.object(
+            analysis_service, "_load_analysis",
+            mocker.AsyncMock(return_value={"repo_id": "etag-repo", "summary": "cached"})
+        )
+        
+        response = await client.get("/api/analysis/etag-repo")
+        assert response.status_code == 200
+        assert response.json()["summary"] == "cached"
+        etag = response.headers["etag"]
+        
+        cached = await client.get("/api/analysis/etag-repo", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        
+        # Second full fetch is served from the in-process cache
+        await client.get("/api/analysis/etag-repo")
+        assert load.call_count == 1
+    
+    async def test_analyze_repo_accepted(self, client: AsyncClient, mocker):
+        """Analysis start returns 202 with Location and Retry-After headers."""
+        from routes.api import analysis_service
+        
+        mocker.patch.object(analysis_service, "start_analysis", mocker.AsyncMock(return_value={
+            "repo_id": "accepted-repo",
+            "session_id": "s1",
+            "status": "processing"
+        }))
+        mocker.patch.object(analysis_service, "execute_analysis", mocker.AsyncMock())
+        
+        response = await client.post(
+            "/api/analyze-repo",
+            json={"repo_url": "https://github.com/owner/repo"}
+        )
+        assert response.status_code == 202
+        assert response.headers["location"] == "/api/status/accepted-repo"
+        assert response.headers["retry-after"] == "2"
+        assert response.json()["status"] == "processing"
+    
+    async def test_analyze_repo_parses_url_once(self, client: AsyncClient, mocker):
+        """Owner/repo extracted by the route are handed to start_analysis."""
+        from routes.api import analysis_service
+        
+        start = mocker.patch.object(analysis_service, "start_analysis", mocker.AsyncMock(return_value={
+            "repo_id": "parsed-repo",
+            "session_id": "s1",
+            "status": "processing"
+        }))
+        mocker.patch.object(analysis_service, "execute_analysis", mocker.AsyncMock())
+        
+        response = await client.post(
+            "/api/analyze-repo",
+            json={"repo_url": "https://github.com/owner/repo.git/"}
+        )
+        assert response.status_code == 202
+        assert start.call_args.kwargs["owner"] == "owner"
+        assert start.call_args.kwargs["repo_name"] == "repo"
+    
+    async def test_analyze_repo_accepts_deep_links(self, client: AsyncClient, mocker):
+        """Links into a repo (tree, blob, issues, query, fragment) still resolve to it."""
+        from routes.api import analysis_service
+        
+        start = mocker.patch.object(analysis_service, "start_analysis", mocker.AsyncMock(return_value={
+            "repo_id": "deep-repo",
+            "session_id": "s1",
+            "status": "processing"
+        }))
+        mocker.patch.object(analysis_service, "execute_analysis", mocker.AsyncMock())
+        
+        for url in [
+            "https://github.com/owner/repo/tree/main",
+            "https://github.com/owner/repo/blob/main/README.md",
+            "http://github.com/owner/repo/issues/3",
+            "https://github.com/owner/repo?tab=readme",
+            "https://github.com/owner/repo#readme",
+            "  https://github.com/owner/repo",
+        ]:
+            response = await client.post("/api/analyze-repo", json={"repo_url": url})
+            assert response.status_code == 202, url
+            assert (start.call_args.kwargs["owner"], start.call_args.kwargs["repo_name"]) == ("owner", "repo")
@@ -0,0 +1,34 @@
+"""
+Tests for the in-memory cache service.
+"""
+import pytest
+
+from services.cache_service import CacheService
+
+
+@pytest.mark.asyncio
+class TestCacheService:
+    """Test cache size bounding and expiry."""
+    
+    async def test_least_recently_used_entry_evicted(self):
+        """Past maxsize, the entry read least recently is dropped first."""
+        cache = CacheService(maxsize=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1  # "b" is now least recently used
+        
+        await cache.set("c", 3)
+        
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+        assert cache.get_stats()["total_entries"] == 2
+    
+    async def test_expired_entries_swept_on_set(self):
+        """Expired entries are removed by later writes, even if never read."""
+        cache = CacheService()
+        await cache.set("stale", "body", ttl=-1)
+        await cache.set("fresh", "body")
+        
+        assert "stale" not in cache._cache
+        assert cache.get_stats()["total_entries"] == 1
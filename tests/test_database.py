@@ -0,0 +1,117 @@
+"""
+Tests for database engine configuration.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from db.database import Base, engine, create_engine_for_url
+from models.schemas import AnalysisSession, ArchitectureComponent, Repository
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    """Engine built the same way as the app's, backed by a temp file."""
+    test_engine = create_engine_for_url(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield test_engine
+    await test_engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestSQLitePragmas:
+    """Test the PRAGMAs applied to every new SQLite connection."""
+
+    async def test_pragmas_applied(self, file_engine):
+        """Every connection gets WAL, NORMAL sync, and a 64MB page cache."""
+        async with file_engine.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+            assert (await conn.exec_driver_sql("PRAGMA synchronous")).scalar() == 1
+            assert (await conn.exec_driver_sql("PRAGMA cache_size")).scalar() == -64000
+            assert (await conn.exec_driver_sql("PRAGMA foreign_keys")).scalar() == 1
+
+    async def test_foreign_keys_enforced(self, file_engine):
+        """A child row pointing at a missing repository is rejected."""
+        session_maker = async_sessionmaker(file_engine, class_=AsyncSession)
+
+        async with session_maker() as db:
+            db.add(AnalysisSession(
+                id=str(uuid.uuid4()),
+                repo_id="missing-repo",
+                status="processing",
+                started_at=datetime.utcnow()
+            ))
+            with pytest.raises(IntegrityError):
+                await db.commit()
+
+
+@pytest.mark.asyncio
+class TestEnginePool:
+    """Test connection pool selection."""
+
+    async def test_app_engine_uses_queue_pool(self):
+        """The app's file-backed engine keeps a persistent connection pool."""
+        assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+
+    async def test_file_url_uses_queue_pool(self, file_engine):
+        """File databases get a pool sized 5 instead of NullPool."""
+        assert isinstance(file_engine.pool, AsyncAdaptedQueuePool)
+        assert file_engine.pool.size() == 5
+        assert file_engine.pool.timeout() == 30
+
+    async def test_memory_url_keeps_static_pool(self):
+        """In-memory databases keep the dialect default."""
+        memory_engine = create_engine_for_url("sqlite+aiosqlite:///:memory:")
+        try:
+            assert isinstance(memory_engine.pool, StaticPool)
+        finally:
+            await memory_engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestCompactJSON:
+    """Test the orjson-encoded BLOB column type."""
+
+    async def _add_repo(self, db):
+        db.add(Repository(id="r1", repo_url="https://github.com/o/r", owner="o", name="r"))
+        await db.flush()
+
+    async def test_round_trip(self, file_engine):
+        """Lists are stored as bytes and read back unchanged."""
+        session_maker = async_sessionmaker(file_engine, class_=AsyncSession)
+
+        async with session_maker() as db:
+            await self._add_repo(db)
+            db.add(ArchitectureComponent(id="c1", repo_id="r1", name="API",
+                                         purpose="Routes", key_files=["main.py", "api.py"]))
+            await db.commit()
+
+        async with session_maker() as db:
+            stored = (await db.execute(text("SELECT typeof(key_files) FROM architecture_components"))).scalar()
+            component = (await db.execute(select(ArchitectureComponent))).scalar_one()
+
+        assert stored == "blob"
+        assert component.key_files == ["main.py", "api.py"]
+
+    async def test_reads_legacy_json_text(self, file_engine):
+        """Rows written as JSON TEXT before the type change still load."""
+        session_maker = async_sessionmaker(file_engine, class_=AsyncSession)
+
+        async with session_maker() as db:
+            await self._add_repo(db)
+            await db.execute(text(
+                "INSERT INTO architecture_components (id, repo_id, name, purpose, key_files) "
+                "VALUES ('c1', 'r1', 'API', 'Routes', '[\"main.py\"]')"
+            ))
+            await db.commit()
+
+        async with session_maker() as db:
+            component = (await db.execute(select(ArchitectureComponent))).scalar_one()
+
+        assert component.key_files == ["main.py"]
@@ -0,0 +1,177 @@
+"""
+Tests for Gemini service.
+"""
+import asyncio
+import threading
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from services.gemini_service import (
+    ANALYSIS_PROMPT_PREFIX, GeminiServiceV2, RepositoryAnalysis, _extract_json_object
+)
+
+
+@pytest.mark.asyncio
+class TestGeminiService:
+    """Test Gemini service functionality."""
+    
+    async def test_generate_analysis_runs_off_event_loop(self, mocker, mock_gemini_analysis):
+        """The blocking SDK call runs in a worker thread, not on the loop."""
+        service = GeminiServiceV2()
+        service.model_name = "test-model"
+        loop_thread = threading.get_ident()
+        call_threads = []
+        
+        def generate_content(**kwargs):
+            call_threads.append(threading.get_ident())
+            return mocker.MagicMock(text=orjson.dumps({**mock_gemini_analysis, "summary": "S" * 250}).decode())
+        
+        service.client = mocker.MagicMock()
+        service.client.models.generate_content = generate_content
+        
+        analysis = await service.generate_analysis("prompt")
+        
+        assert isinstance(analysis, RepositoryAnalysis)
+        assert call_threads and call_threads[0] != loop_thread
+    
+    async def test_generate_analysis_without_client(self):
+        """Without a configured client there is no analysis to return."""
+        service = GeminiServiceV2()
+        service.client = None
+        
+        assert await service.generate_analysis("prompt") is None
+    
+    async def test_generate_analysis_unwraps_fenced_and_prose_replies(self, mocker, mock_gemini_analysis):
+        """Fenced and prose-wrapped replies still yield the analysis."""
+        service = GeminiServiceV2()
+        service.model_name = "test-model"
+        body = orjson.dumps({**mock_gemini_analysis, "summary": "S" * 250}).decode()
+        service.client = mocker.MagicMock()
+        service.client.models.generate_content.side_effect = [
+            mocker.MagicMock(text=f"```json\n{body}\n```"),
+            mocker.MagicMock(text=f"Here is the analysis: {body} Let me know if you need more {{details}}."),
+            mocker.MagicMock(text=f"\n  {body}\n"),
+            mocker.MagicMock(text=f"{body}\n```"),
+            mocker.MagicMock(text=f"{body} Hope this helps {{more}}!"),
+        ]
+        
+        for prompt in ("fenced", "prose", "padded", "trailing fence", "trailing prose"):
+            analysis = await service.generate_analysis(prompt)
+            assert analysis is not None and analysis.summary == "S" * 250
+    
+    async def test_generate_analysis_rejects_invalid_reply(self, mocker, mock_gemini_analysis):
+        """Malformed JSON and schema violations both yield no analysis."""
+        service = GeminiServiceV2()
+        service.model_name = "test-model"
+        service.client = mocker.MagicMock()
+        service.client.models.generate_content.side_effect = [
+            mocker.MagicMock(text='{"summary": '),
+            mocker.MagicMock(text=orjson.dumps({**mock_gemini_analysis, "summary": "too short"}).decode()),
+        ]
+        
+        service.logger = mocker.MagicMock()
+        
+        assert await service.generate_analysis("first prompt") is None
+        assert await service.generate_analysis("second prompt") is None
+        assert service.logger.warning.call_count == 2
+    
+    async def test_identical_prompts_share_one_call(self, mocker, mock_gemini_analysis):
+        """Concurrent requests for the same prompt make a single Gemini call."""
+        service = GeminiServiceV2()
+        service.model_name = "test-model"
+        calls = []
+        release = threading.Event()
+        
+        def generate_content(**kwargs):
+            calls.append(kwargs["contents"])
+            release.wait(timeout=5)
+            return mocker.MagicMock(text=orjson.dumps({**mock_gemini_analysis, "summary": "S" * 250}).decode())
+        
+        service.client = mocker.MagicMock()
+        service.client.models.generate_content = generate_content
+        
+        first = asyncio.ensure_future(service.generate_analysis("same prompt"))
+        second = asyncio.ensure_future(service.generate_analysis("same prompt"))
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(first, second)
+        
+        assert calls == ["same prompt"]
+        assert results[0] is results[1]
+        assert service._inflight == {}
+    
+    async def test_fallback_analysis_is_valid(self):
+        """The unvalidated fallback still satisfies the schema."""
+        service = GeminiServiceV2()
+        
+        fallback = service.fallback_analysis({"repo_name": "owner/repo", "primary_language": "Python"})
+        
+        assert RepositoryAnalysis.model_validate(fallback.model_dump()) == fallback
+        assert fallback.tech_stack[0].name == "Python"
+    
+    async def test_fallback_analysis_cached_per_repo(self):
+        """Repeated fallbacks for a repo reuse one frozen analysis."""
+        service = GeminiServiceV2()
+        context = {"repo_name": "owner/cached", "primary_language": "Go"}
+        
+        first = service.fallback_analysis(context)
+        
+        assert service.fallback_analysis(dict(context)) is first
+        assert service.fallback_analysis({**context, "primary_language": "Rust"}) is not first
+        with pytest.raises(ValidationError):
+            first.summary = "changed"
+    
+    async def test_prompt_code_content_budget(self):
+        """File contents beyond the overall budget are left out of the prompt."""
+        service = GeminiServiceV2()
+        file_contents = {f"src/file{i}.py": "x" * 10000 for i in range(20)}
+        
+        prompt = service.build_prompt({"file_contents": file_contents})
+        
+        assert "### src/file0.py" in prompt
+        assert "### src/file19.py" not in prompt
+        assert prompt.count("x") <= service.CODE_CONTENT_BUDGET + 100
+    
+    async def test_prompt_starts_with_shared_prefix(self):
+        """Repository data follows the invariant instruction prefix."""
+        service = GeminiServiceV2()
+        
+        first = service.build_prompt({"repo_name": "a/one", "primary_language": "Python"})
+        second = service.build_prompt({"repo_name": "b/two", "primary_language": "Go"})
+        
+        assert first.startswith(ANALYSIS_PROMPT_PREFIX)
+        assert second.startswith(ANALYSIS_PROMPT_PREFIX)
+        assert "Repository: a/one" in first and "Primary Language: Go" in second
+
+
+class TestExtractJsonObject:
+    """Test pulling the JSON object out of a prose-wrapped reply."""
+    
+    def test_ignores_braces_in_strings(self):
+        """A } inside a string value doesn't end the object."""
+        text = 'Here you go: {"summary": "uses {braces} and \\"quotes}\\"", "n": {"a": 1}} trailing }'
+        
+        extracted = _extract_json_object(text)
+        
+        assert orjson.loads(extracted) == {"summary": 'uses {braces} and "quotes}"', "n": {"a": 1}}
+    
+    def test_unbalanced_returns_none(self):
+        """No closing brace means no object."""
+        assert _extract_json_object('no json {"a": 1') is None
+        assert _extract_json_object('no json at all') is None
+
+
+class TestNoFluff:
+    """Test fluff-phrase stripping on free-text fields."""
+    
+    def test_strips_phrases_any_case(self, mock_gemini_analysis):
+        """Sentence-case phrases are removed; words merely containing them are kept."""
+        analysis = RepositoryAnalysis(**{
+            **mock_gemini_analysis,
+            "summary": "S" * 250,
+            "purpose": "Basically a CLI. It’s important to note it is nonessentially fast."
+        })
+        
+        assert analysis.purpose == "a CLI.  it is nonessentially fast."
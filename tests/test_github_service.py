@@ -1,7 +1,12 @@
 """
 Tests for GitHub service.
 """
+import asyncio
+import base64
+
+import httpx
 import pytest
+from services.cache_service import CacheService
 from services.github_service import GitHubService
 
 
@@ -42,6 +47,13 @@ class TestGitHubService:
         assert owner == "owner"
         assert repo == "repo"
     
+    def test_parse_repo_url_keeps_git_inside_name(self):
+        """Only a trailing .git suffix is stripped."""
+        service = GitHubService()
+        owner, repo = service.parse_repo_url("https://github.com/owner/owner.github.io.git")
+        assert owner == "owner"
+        assert repo == "owner.github.io"
+    
     @pytest.mark.asyncio
     async def test_get_repo_metadata_caching(self, mocker):
         """Test that metadata is cached."""
@@ -69,3 +81,361 @@ class TestGitHubService:
         
         # HTTP client should only be called once
         assert mock_client.get.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_repo_metadata_revalidated_after_expiry(self, mocker):
+        """Once the metadata entry expires, a 304 reuses the last body."""
+        service = GitHubService()
+        service.cache = CacheService()
+        
+        ok = mocker.MagicMock(status_code=200, headers={"ETag": '"v1"'})
+        ok.json.return_value = {"name": "test-repo"}
+        not_modified = mocker.MagicMock(status_code=304, headers={})
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(side_effect=[ok, not_modified])
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        first = await service.get_repo_metadata("owner", "repo")
+        await service.cache.delete(service.cache._generate_key("github:metadata", "owner", "repo"))
+        second = await service.get_repo_metadata("owner", "repo")
+        
+        assert first == second == {"name": "test-repo"}
+        assert mock_client.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+    
+    @pytest.mark.asyncio
+    async def test_readme_decoded_from_metadata(self, mocker):
+        """The base64 README prefix is decoded without a second download."""
+        service = GitHubService()
+        service.cache = CacheService()
+        readme = "# Título\n" + "x" * 100
+        encoded = base64.b64encode(readme.encode()).decode()
+        
+        response = mocker.MagicMock(status_code=200, headers={})
+        response.json.return_value = {
+            "encoding": "base64",
+            # GitHub wraps the encoded content at 60 columns
+            "content": "\n".join(encoded[i:i + 60] for i in range(0, len(encoded), 60)),
+            "download_url": "https://raw.githubusercontent.com/owner/repo/main/README.md"
+        }
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(return_value=response)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        assert await service.get_readme("owner", "repo") == readme
+        assert await service.get_readme("owner", "repo", max_bytes=9) == "# Título"
+        assert all("raw.githubusercontent" not in c.args[0] for c in mock_client.get.call_args_list)
+    
+    @pytest.mark.asyncio
+    async def test_file_content_concurrency_bounded(self, mocker):
+        """Gathered file fetches never exceed the concurrency limit."""
+        service = GitHubService()
+        service._semaphore = asyncio.Semaphore(2)
+        in_flight = 0
+        peak = 0
+        
+        async def fake_get(url, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = mocker.MagicMock()
+            response.json.return_value = {"download_url": url + "/raw"}
+            response.text = "content"
+            return response
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = fake_get
+        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = mocker.AsyncMock(return_value=False)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        results = await asyncio.gather(*(
+            service.get_file_content("owner", "repo", f"file{i}.py") for i in range(6)
+        ))
+        
+        assert results == ["content"] * 6
+        assert peak == 2
+    
+    @pytest.mark.asyncio
+    async def test_large_file_content_read_capped(self, mocker):
+        """Files over the byte cap are streamed and cut off, not read whole."""
+        service = GitHubService()
+        service.cache = CacheService()
+        chunks_read = 0
+        
+        metadata = mocker.MagicMock(status_code=200, headers={})
+        metadata.json.return_value = {"download_url": "https://raw/big.js", "size": 10_000_000}
+        
+        async def aiter_bytes():
+            nonlocal chunks_read
+            for _ in range(1000):
+                chunks_read += 1
+                yield b"a" * 4096
+        
+        stream_response = mocker.MagicMock(raise_for_status=mocker.MagicMock())
+        stream_response.aiter_bytes = aiter_bytes
+        stream_cm = mocker.MagicMock()
+        stream_cm.__aenter__ = mocker.AsyncMock(return_value=stream_response)
+        stream_cm.__aexit__ = mocker.AsyncMock(return_value=False)
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(return_value=metadata)
+        mock_client.stream = mocker.MagicMock(return_value=stream_cm)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        content = await service.get_file_content("owner", "repo", "big.js", max_bytes=10000)
+        
+        assert content == "a" * 10000
+        assert chunks_read == 3
+        assert mock_client.get.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_conditional_get_reuses_body_on_304(self, mocker):
+        """Repeat requests send If-None-Match and reuse the cached body on 304."""
+        service = GitHubService()
+        service.cache = CacheService()
+        
+        ok = mocker.MagicMock(status_code=200, headers={"ETag": '"abc"'})
+        ok.json.return_value = [{"number": 1}]
+        not_modified = mocker.MagicMock(status_code=304, headers={})
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(side_effect=[ok, not_modified])
+        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = mocker.AsyncMock(return_value=False)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        first = await service.get_issues("owner", "repo")
+        second = await service.get_issues("owner", "repo")
+        
+        assert first == second == [{"number": 1}]
+        assert "If-None-Match" not in mock_client.get.call_args_list[0].kwargs["headers"]
+        assert mock_client.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"abc"'
+    
+    @pytest.mark.asyncio
+    async def test_rate_limited_request_retried_after_retry_after(self, mocker):
+        """A 429 with Retry-After is retried after the requested wait."""
+        service = GitHubService()
+        service.cache = CacheService()
+        sleep = mocker.patch("services.github_service.asyncio.sleep", mocker.AsyncMock())
+        
+        throttled = mocker.MagicMock(status_code=429, headers={"Retry-After": "2"})
+        ok = mocker.MagicMock(status_code=200, headers={})
+        ok.json.return_value = [{"number": 1}]
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(side_effect=[throttled, ok])
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        assert await service.get_issues("owner", "repo") == [{"number": 1}]
+        sleep.assert_awaited_once_with(2.0)
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_capped(self, mocker):
+        """Waits beyond the backoff budget fail fast instead of hanging."""
+        service = GitHubService()
+        service.cache = CacheService()
+        sleep = mocker.patch("services.github_service.asyncio.sleep", mocker.AsyncMock())
+        
+        throttled = mocker.MagicMock(
+            status_code=403,
+            headers={"Retry-After": "120"},
+            raise_for_status=mocker.MagicMock(side_effect=httpx.HTTPStatusError(
+                "Forbidden", request=mocker.MagicMock(), response=mocker.MagicMock()
+            ))
+        )
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(return_value=throttled)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        assert await service.get_issues("owner", "repo") == []
+        assert mock_client.get.call_count == 1
+        sleep.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_http_client_shared_and_closed(self, mocker):
+        """All requests reuse one HTTP client until close()."""
+        service = GitHubService()
+        
+        response = mocker.MagicMock(status_code=200, headers={})
+        response.json.return_value = []
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(return_value=response)
+        mock_client.aclose = mocker.AsyncMock()
+        client_cls = mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        await service.get_issues("owner", "repo-a")
+        await service.list_files("owner", "repo-b")
+        await service.close()
+        
+        assert client_cls.call_count == 1
+        assert mock_client.get.call_count == 2
+        mock_client.aclose.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_issue_lists_single_graphql_query_with_token(self, mocker):
+        """With a token, open and closed issues come from one GraphQL request."""
+        service = GitHubService()
+        service.token = "secret"
+        
+        response = mocker.MagicMock(status_code=200)
+        response.json.return_value = {"data": {"repository": {
+            "open": {"nodes": [{"number": 2, "title": "Crash on start"}]},
+            "closed": {"nodes": [{"number": 1, "title": "Typo"}]}
+        }}}
+        mock_client = mocker.MagicMock()
+        mock_client.post = mocker.AsyncMock(return_value=response)
+        mock_client.get = mocker.AsyncMock()
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        open_issues, closed_issues = await service.get_issue_lists("owner", "repo")
+        
+        assert open_issues == [{"number": 2, "title": "Crash on start"}]
+        assert closed_issues == [{"number": 1, "title": "Typo"}]
+        assert mock_client.post.await_count == 1
+        assert mock_client.post.call_args.kwargs["json"]["variables"]["open"] == 30
+        mock_client.get.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_issue_lists_malformed_graphql_falls_back_to_rest(self, mocker):
+        """A non-JSON or oddly shaped GraphQL reply falls back to the REST endpoint."""
+        service = GitHubService()
+        service.token = "secret"
+        service.cache = CacheService()
+        
+        html = mocker.MagicMock(status_code=200)
+        html.json.side_effect = ValueError("Expecting value")
+        missing_nodes = mocker.MagicMock(status_code=200)
+        missing_nodes.json.return_value = {"data": {"repository": {"open": None}}}
+        rest = mocker.MagicMock(status_code=200, headers={})
+        rest.json.return_value = [{"number": 1}]
+        
+        mock_client = mocker.MagicMock()
+        mock_client.post = mocker.AsyncMock(side_effect=[html, missing_nodes])
+        mock_client.get = mocker.AsyncMock(return_value=rest)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        for _ in range(2):
+            assert await service.get_issue_lists("owner", "repo") == ([{"number": 1}], [{"number": 1}])
+    
+    @pytest.mark.asyncio
+    async def test_issue_lists_rest_without_token(self, mocker):
+        """Without a token the REST issues endpoint is used, PRs filtered out."""
+        service = GitHubService()
+        service.token = None
+        service.cache = CacheService()
+        
+        response = mocker.MagicMock(status_code=200, headers={})
+        response.json.return_value = [{"number": 1}, {"number": 2, "pull_request": {}}]
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(return_value=response)
+        mock_client.post = mocker.AsyncMock()
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        assert await service.get_issue_lists("owner", "repo") == ([{"number": 1}], [{"number": 1}])
+        mock_client.post.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_repository_tree_uses_default_branch(self, mocker):
+        """A known default branch needs exactly one tree request."""
+        service = GitHubService()
+        service.cache = CacheService()
+        
+        response = mocker.MagicMock(status_code=200, headers={})
+        response.json.return_value = {"tree": [{"path": "a.py", "type": "blob"}], "truncated": False}
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(return_value=response)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        tree = await service.get_repository_tree("owner", "repo", "develop")
+        
+        assert tree == [{"path": "a.py", "type": "blob"}]
+        assert mock_client.get.call_count == 1
+        assert "/git/trees/develop?" in mock_client.get.call_args.args[0]
+    
+    @pytest.mark.asyncio
+    async def test_truncated_tree_walks_contents(self, mocker):
+        """A truncated tree is rebuilt from the contents API, skipping ignored dirs."""
+        service = GitHubService()
+        service.cache = CacheService()
+        listings = {
+            "": [
+                {"name": "main.py", "path": "main.py", "type": "file", "size": 10},
+                {"name": "src", "path": "src", "type": "dir"},
+                {"name": "node_modules", "path": "node_modules", "type": "dir"},
+            ],
+            "src": [{"name": "app.py", "path": "src/app.py", "type": "file", "size": 20}],
+        }
+        
+        async def fake_get(url, **kwargs):
+            response = mocker.MagicMock(status_code=200, headers={})
+            if "/git/trees/" in url:
+                response.json.return_value = {"tree": [{"path": "main.py", "type": "blob"}], "truncated": True}
+            else:
+                response.json.return_value = listings[url.split("/contents/", 1)[1]]
+            return response
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = fake_get
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        tree = await service.get_repository_tree("owner", "repo", "main")
+        
+        assert tree == [
+            {"path": "main.py", "type": "blob", "size": 10},
+            {"path": "src", "type": "tree"},
+            {"path": "node_modules", "type": "tree"},
+            {"path": "src/app.py", "type": "blob", "size": 20},
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_repository_tree_tries_branches_concurrently(self, mocker):
+        """Branch fallbacks are requested together and the first branch in order wins."""
+        service = GitHubService()
+        service.cache = CacheService()
+        requested = []
+        
+        async def fake_get(url, **kwargs):
+            requested.append(url)
+            await asyncio.sleep(0)
+            if "/trees/main" in url:
+                return mocker.MagicMock(
+                    status_code=404,
+                    raise_for_status=mocker.MagicMock(side_effect=httpx.HTTPStatusError(
+                        "Not Found", request=mocker.MagicMock(), response=mocker.MagicMock()
+                    ))
+                )
+            response = mocker.MagicMock(status_code=200, headers={})
+            response.json.return_value = {"tree": [{"path": url.rsplit("/", 1)[-1]}]}
+            return response
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = fake_get
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        tree = await service.get_repository_tree("owner", "repo")
+        
+        assert len(requested) == 2
+        assert tree == [{"path": "master?recursive=1"}]
+    
+    @pytest.mark.asyncio
+    async def test_etag_bodies_bounded(self, mocker):
+        """Revalidation bodies live in their own store, capped in size."""
+        service = GitHubService()
+        service._etags.maxsize = 2
+        
+        def respond(url, **kwargs):
+            response = mocker.MagicMock(status_code=200, headers={"ETag": f'"{url}"'})
+            response.json.return_value = {"type": "file"}
+            return response
+        
+        mock_client = mocker.MagicMock()
+        mock_client.get = mocker.AsyncMock(side_effect=respond)
+        mocker.patch("httpx.AsyncClient", return_value=mock_client)
+        
+        for i in range(5):
+            await service.get_file_content("owner", "repo", f"file{i}.py")
+        
+        assert service._etags.get_stats()["total_entries"] == 2
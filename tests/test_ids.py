@@ -0,0 +1,55 @@
+"""
+Tests for primary key generation.
+"""
+import time
+import uuid
+
+import pytest
+
+from utils.ids import uuid7, uuid7_batch
+
+
+class TestUUID7:
+    """Test UUIDv7 generation."""
+
+    def test_version_and_variant(self):
+        """Generated IDs are valid RFC 4122 version 7 UUIDs."""
+        value = uuid.UUID(uuid7())
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_embeds_current_timestamp(self):
+        """The leading 48 bits hold the creation time in milliseconds."""
+        before = time.time_ns() // 1_000_000
+        value = uuid.UUID(uuid7())
+        after = time.time_ns() // 1_000_000
+        assert before <= value.int >> 80 <= after
+
+    def test_ids_sort_by_creation_time(self):
+        """IDs generated in later milliseconds sort after earlier ones."""
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        assert first < second
+
+    def test_unique(self):
+        """IDs are unique within the same millisecond."""
+        assert len({uuid7() for _ in range(1000)}) == 1000
+
+
+class TestUUID7Batch:
+    """Test batched UUIDv7 generation."""
+
+    def test_batch_ids_valid_unique_and_ordered(self):
+        """A batch yields distinct version 7 IDs in generation order."""
+        ids = uuid7_batch(50)
+        values = [uuid.UUID(i) for i in ids]
+        assert all(v.version == 7 and v.variant == uuid.RFC_4122 for v in values)
+        assert len(set(ids)) == 50
+        assert ids == sorted(ids)
+
+    def test_batch_size_limit(self):
+        """The 12-bit counter caps a batch at 4096 IDs."""
+        assert len(uuid7_batch(0)) == 0
+        with pytest.raises(ValueError):
+            uuid7_batch(4097)
@@ -4,11 +4,20 @@ Provides consistent, JSON-formatted logs for production monitoring.
 """
 import logging
 import sys
+import traceback
 from typing import Any, Dict
-import json
+import orjson
 from datetime import datetime
 
 
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+
 class StructuredLogger:
     """Structured logger that outputs JSON-formatted logs."""
     
@@ -26,21 +35,18 @@ class StructuredLogger:
     
     def _log(self, level: str, message: str, **kwargs: Any):
         """Internal logging method."""
+        levelno = _LEVELS[level]
+        # Check the level first so filtered calls skip the JSON encoding
+        if not self.logger.isEnabledFor(levelno):
+            return
+        
         log_data = {
             "timestamp": datetime.utcnow().isoformat(),
             "level": level,
             "message": message,
             **kwargs
         }
-        
-        if level == "INFO":
-            self.logger.info(json.dumps(log_data))
-        elif level == "WARNING":
-            self.logger.warning(json.dumps(log_data))
-        elif level == "ERROR":
-            self.logger.error(json.dumps(log_data))
-        elif level == "DEBUG":
-            self.logger.debug(json.dumps(log_data))
+        self.logger.log(levelno, orjson.dumps(log_data).decode())
     
     def info(self, message: str, **kwargs: Any):
         """Log info message."""
@@ -57,6 +63,10 @@ class StructuredLogger:
     def debug(self, message: str, **kwargs: Any):
         """Log debug message."""
         self._log("DEBUG", message, **kwargs)
+    
+    def exception(self, message: str, **kwargs: Any):
+        """Log error message with the traceback of the exception being handled."""
+        self._log("ERROR", message, traceback=traceback.format_exc(), **kwargs)
 
 
 class StructuredFormatter(logging.Formatter):